@@ -1,38 +1,92 @@
 from flask import Flask, render_template
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy.engine import make_url
 import os
 import logging
 
 db = SQLAlchemy()
 migrate = Migrate()
 
-def create_app(config_name=None):
+def create_app(config_name=None, config_class=None):
     app = Flask(__name__)
     
-    if not config_name:
-        config_name = os.environ.get('FLASK_ENV', 'development') # defined in .env
+    if isinstance(config_name, type): # create_app(TestingConfig)
+        config_class, config_name = config_name, None
 
-    from config import config
-    cfg = config.get(config_name)
-    if not cfg:
-        app.logger.warning(f"Config '{config_name}' not found, defaulting to 'development'.")
-        cfg = config['development'] # fallback to development if config_name is invalid
+    if config_class is not None:
+        cfg = config_class
+    else:
+        if not config_name:
+            config_name = os.environ.get('FLASK_ENV', 'development') # defined in .env
+
+        from config import config
+        cfg = config.get(config_name)
+        if not cfg:
+            app.logger.warning(f"Config '{config_name}' not found, defaulting to 'development'.")
+            cfg = config['development'] # fallback to development if config_name is invalid
     
     app.config.from_object(cfg)
-    app.logger.info(f"Application configured with {config_name.capitalize()}Config.")
+    app.logger.info(f"Application configured with {cfg.__name__}.")
 
     # Initialize extensions and app-specific configurations
     if hasattr(cfg, 'init_app'):
         cfg.init_app(app)
     
+    # Graceful shutdown runs first so a draining process refuses new requests before any other work, and counts every in-flight request
+    from app import shutdown
+    shutdown.init_app(app)
+    
+    # Profiling hooks are installed next so a profiled request covers every other before_request handler
+    from app import profiling
+    profiling.init_app(app)
+    
+    # Request deadlines configure the engine's pool and statement timeouts, so they must be set up before the database
+    from app import deadlines
+    deadlines.init_app(app)
+    
+    # Server-side prepared statements, only psycopg 3 supports them (psycopg2 always sends the full query text)
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if uri and make_url(uri).drivername == 'postgresql+psycopg':
+        engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        engine_options.setdefault('connect_args', {}).setdefault('prepare_threshold', app.config.get('DB_PREPARE_THRESHOLD'))
+    elif uri and make_url(uri).get_backend_name() == 'postgresql' and app.config.get('DB_PREPARE_THRESHOLD') is not None:
+        app.logger.info("DB_PREPARE_THRESHOLD is ignored, the psycopg2 driver has no server-side prepared statements (use postgresql+psycopg://).")
+    
     db.init_app(app)
     migrate.init_app(app, db)
     
+    # Connection pragmas and writer serialization when running on SQLite
+    from app import sqlite_tuning
+    sqlite_tuning.init_app(app)
+
+    from app.services.todo_stats_service import todo_stats
+    todo_stats.init_app(app)
+    from app.services.job_queue import job_queue
+    job_queue.init_app(app)
+    from app.services.write_coalescer import write_coalescer
+    write_coalescer.init_app(app)
+    from app.services.response_cache import response_cache
+    response_cache.init_app(app)
+    
+    # Tenant resolution and quotas, the API blueprint authenticates every request against TENANT_API_KEYS
+    from app import tenancy
+    tenancy.init_app(app)
+    
     # Register Blueprints
     from app.api.routes import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
     app.logger.info("API blueprint registered.")
+    from app.api.admin import admin_bp
+    app.register_blueprint(admin_bp, url_prefix='/api/admin') # bulk import/export, only served when ADMIN_TOKEN is set
+    
+    # Register the liveness (/healthz) and readiness (/readyz) probes used by the orchestrator
+    from app import health
+    health.init_app(app)
+    
+    # Register CLI commands (next to the Flask-Migrate 'db' group)
+    from app.cli import todos_cli
+    app.cli.add_command(todos_cli)
     
     # Basic route for serving the frontend
     @app.route('/')
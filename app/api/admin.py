@@ -0,0 +1,82 @@
+import hmac
+import tempfile
+from flask import Blueprint, Response, request, abort, current_app, stream_with_context
+from .formats import negotiated_response
+from ..deadlines import lift_deadline
+from ..services.todo_transfer_service import TodoTransferService, TransferFormatError, MIMETYPES
+from ..tenancy import authenticate
+
+admin_bp = Blueprint('admin', __name__)
+admin_bp.before_request(authenticate) # admin operations act on the tenant of the API key, like the rest of the API
+admin_bp.before_request(lift_deadline) # a single COPY of a large tenant outlasts REQUEST_DEADLINE_SECONDS
+
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024 # larger uploads are buffered on disk
+CHUNK_SIZE = 64 * 1024
+
+@admin_bp.before_request
+def require_admin_token():
+    """Reject requests without the ADMIN_TOKEN, the admin endpoints do not exist while it is unset."""
+    expected = current_app.config['ADMIN_TOKEN']
+    if not expected:
+        abort(404)
+    supplied = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(supplied.encode(), expected.encode()):
+        current_app.logger.warning(f"Rejected admin request to {request.path} with an invalid token.")
+        abort(401, description="Invalid admin token")
+
+def _requested_format():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in MIMETYPES:
+        abort(400, description=f"Unsupported format '{fmt}', expected one of {', '.join(MIMETYPES)}")
+    return fmt
+
+@admin_bp.route('/todos/export', methods=['GET'])
+def export_todos():
+    """Export the tenant's live Todo items as a file download.
+
+    The response is streamed while the rows are read, one batch at a time (COPY TO STDOUT on PostgreSQL with psycopg 3), so the first bytes
+    are sent right away and the export is never held in full on the server. Like the import, it is exempt from REQUEST_DEADLINE_SECONDS.
+
+    Returns:
+        Response: The CSV (default) or Parquet (format=parquet) file with an HTTP status code 200 (OK), or a 400 error response for an unsupported
+                  format.
+    """
+    fmt = _requested_format()
+    try:
+        chunks = TodoTransferService.iter_export(fmt, batch_size=current_app.config['TRANSFER_BATCH_SIZE'],
+                                                 progress=lambda exported: current_app.logger.debug(f"Export progress: {exported} rows."))
+    except TransferFormatError as err:
+        abort(400, description=str(err))
+
+    response = Response(stream_with_context(chunks), mimetype=MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=todos.{fmt}'
+    return response
+
+@admin_bp.route('/todos/import', methods=['POST'])
+def import_todos():
+    """Bulk create Todo items from an uploaded file.
+
+    The file is sent either as the raw request body or as the multipart field "file". Rows are validated and inserted in batches of
+    TRANSFER_BATCH_SIZE (COPY FROM STDIN on PostgreSQL); invalid rows are skipped and reported by row number. The request is exempt from
+    REQUEST_DEADLINE_SECONDS, so no statement_timeout cuts a batch short.
+
+    Returns:
+        tuple: A Flask Response object with the imported and rejected counts and the error messages, and an HTTP status code 200 (OK), a 400
+               error response for an unsupported format, or 403 (Forbidden) if the import would exceed the tenant's quota.
+    """
+    fmt = _requested_format()
+    upload = request.files.get('file')
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY) as spool:
+        source = upload.stream if upload is not None else request.stream
+        while chunk := source.read(CHUNK_SIZE):
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            report = TodoTransferService.import_todos(spool, fmt, batch_size=current_app.config['TRANSFER_BATCH_SIZE'],
+                                                      progress=lambda read, imported: current_app.logger.info(
+                                                          f"Import progress: read {read} rows, imported {imported}."))
+        except TransferFormatError as err:
+            abort(400, description=str(err))
+    current_app.logger.info(f"Imported {report['imported']} Todo items, rejected {report['rejected']} rows.")
+    report['errors'] = {str(row): messages for row, messages in report['errors'].items()}
+    return negotiated_response(report, 200)
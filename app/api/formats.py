@@ -0,0 +1,78 @@
+from flask import request, jsonify, abort, current_app
+
+# Optional binary encodings, each one is only offered when its package is installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+CBOR_MIMETYPE = 'application/cbor'
+
+def _binary_codecs():
+    """Map each available binary mimetype to its (encode, decode) pair."""
+    codecs = {}
+    if msgpack is not None:
+        for mimetype in MSGPACK_MIMETYPES:
+            codecs[mimetype] = (lambda data: msgpack.packb(data, use_bin_type=True), lambda raw: msgpack.unpackb(raw, raw=False))
+    if cbor2 is not None:
+        codecs[CBOR_MIMETYPE] = (cbor2.dumps, cbor2.loads)
+    return codecs
+
+BINARY_CODECS = _binary_codecs()
+OFFERED_MIMETYPES = [JSON_MIMETYPE, *BINARY_CODECS] # JSON first so it wins for */* and missing Accept headers
+
+def negotiated_mimetype():
+    """The response mimetype preferred by the request's Accept header among the offered ones, JSON by default."""
+    return request.accept_mimetypes.best_match(OFFERED_MIMETYPES, default=JSON_MIMETYPE)
+
+def negotiated_response(payload, status):
+    """Encode a response payload in the format preferred by the request's Accept header.
+
+    JSON is produced through jsonify exactly as before, MessagePack and CBOR are produced when requested and installed. The same TodoSchema
+    output is encoded in every format, datetimes are already ISO 8601 strings at this point.
+
+    Args:
+        payload: A JSON-compatible object, typically the output of todo_schema.dump or todos_schema.dump.
+        status (int): The HTTP status code of the response.
+
+    Returns:
+        tuple: A Flask Response object with the encoded payload and the HTTP status code.
+    """
+    mimetype = negotiated_mimetype()
+    if mimetype == JSON_MIMETYPE:
+        response = jsonify(payload)
+    else:
+        encode, _ = BINARY_CODECS[mimetype]
+        response = current_app.response_class(encode(payload), mimetype=mimetype)
+    response.vary.add('Accept') # the body depends on the Accept header, caches must key on it
+    return response, status
+
+def load_request_data():
+    """Decode the request body according to its Content-Type.
+
+    JSON bodies are read with request.get_json() as before, MessagePack and CBOR bodies are decoded with their codec.
+
+    Returns:
+        The decoded request body, or None if the body is empty.
+    """
+    mimetype = request.mimetype
+    if mimetype in MSGPACK_MIMETYPES or mimetype == CBOR_MIMETYPE:
+        if mimetype not in BINARY_CODECS:
+            abort(415, description=f"Content type {mimetype} is not supported by this server")
+        raw = request.get_data(cache=False)
+        if not raw:
+            return None
+        _, decode = BINARY_CODECS[mimetype]
+        try:
+            return decode(raw)
+        except Exception:
+            current_app.logger.error(f"Malformed {mimetype} request body.")
+            abort(400, description=f"Malformed {mimetype} request body")
+    return request.get_json()
@@ -1,32 +1,141 @@
-from flask import Blueprint, request, jsonify, abort, current_app
+from urllib.parse import urlencode
+from flask import Blueprint, request, abort, current_app
 from marshmallow import ValidationError
-from ..schemas import todo_schema, todos_schema # schemas for serialization/deserialization
+from ..models import Todo
+from ..schemas import todo_schema, todos_schema, todo_payload_validator # schemas for serialization, fast path for request validation
+from .formats import negotiated_response, negotiated_mimetype, load_request_data # JSON, MessagePack and CBOR content negotiation
 from ..services.todo_db_service import TodoService
+from ..services.todo_stats_service import todo_stats
+from ..services.todo_sync_service import START, TodoSyncService, SyncTokenError, SyncTokenExpired
+from ..services.write_coalescer import write_coalescer
+from ..services.response_cache import response_cache
+from ..tenancy import authenticate, current_tenant
 
 api_bp = Blueprint('api', __name__)
+api_bp.before_request(authenticate) # every API request is scoped to the tenant of its API key
+
+def _query_flag(name):
+    """Interpret a boolean query string parameter such as ?include_archived=true."""
+    return request.args.get(name, 'false').lower() in ('1', 'true', 'yes')
+
+def _cache_key():
+    """The response cache key of the current request, with its query parameters in a canonical order."""
+    path = f"{request.path}?{urlencode(sorted(request.args.items(multi=True)))}"
+    return response_cache.key(current_tenant(), path, negotiated_mimetype())
+
+def _cached_response(body, mimetype):
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.vary.add('Accept')
+    response.headers['X-Cache'] = 'HIT'
+    return response
 
 @api_bp.route('/todos', methods=['GET'])
 def get_todos():
     """Retrieve a list of all Todo items.
 
     This endpoint fetches all records from the Todo table in the database, serializes them using the todos_schema (which handles multiple items),
-    and returns them as a JSON array.
+    and returns them as a JSON array. Soft deleted items are never returned, archived items only when include_archived=true is passed.
+    Passing limit (and after_id for the following pages) returns one page of live items ordered by ID instead of the full list. The encoded
+    response bytes are cached until the tenant's data changes (see ResponseCache), the X-Cache header tells whether the cache answered.
 
     Returns:
-        tuple: A Flask Response object containing the JSON list of todos and an HTTP status code 200 (OK).
+        tuple: A Flask Response object containing the JSON list of todos and an HTTP status code 200 (OK), or a 400 error response for an invalid
+               page request.
     """
-    current_app.logger.info("Fetching all Todo items.")
-    todos = TodoService.get_all_todos() # fetch all Todo records from the database
+    cache_key = None
+    if response_cache.enabled():
+        cache_key = _cache_key() # taken before the query, a write committed meanwhile prevents storing a stale body
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return _cached_response(*cached)
+
+    if 'limit' in request.args:
+        limit = request.args.get('limit', type=int)
+        after_id = request.args.get('after_id', 0, type=int)
+        max_page_size = current_app.config['TODO_PAGE_MAX_SIZE']
+        if limit is None or not 0 < limit <= max_page_size or after_id is None or _query_flag('include_archived'):
+            current_app.logger.error(f"Invalid page request: {dict(request.args)}")
+            abort(400, description=f"limit must be between 1 and {max_page_size}, after_id an integer, and archived items are not paged")
+        current_app.logger.info(f"Fetching {limit} Todo items after ID {after_id}.")
+        todos = TodoService.get_todos_page(after_id, limit) # keyset pagination, used by the front-end for large lists
+    else:
+        current_app.logger.info("Fetching all Todo items.")
+        todos = TodoService.get_all_todos(include_archived=_query_flag('include_archived')) # fetch all live Todo records from the database
     result = todos_schema.dump(todos)   # serialize the list of Todo objects into a JSON-compatible format
     current_app.logger.debug(f"Returning {len(todos)} Todo items.")
-    return jsonify(result), 200
+    response, status = negotiated_response(result, 200)
+    if cache_key is not None:
+        response_cache.put(cache_key, response.get_data(), response.mimetype)
+        response.headers['X-Cache'] = 'MISS'
+    return response, status
+
+@api_bp.route('/todos/stats', methods=['GET'])
+def get_todo_stats():
+    """Retrieve aggregate counts of total, completed and open Todo items.
+
+    The counts are served from the todo_stats summary table, maintained by TodoService in the transaction of every write and periodically
+    reconciled with the database, so this endpoint does not scan the Todo table. Passing the query parameter bucket=day additionally returns the counts grouped by the day of created_at.
+
+    Returns:
+        tuple: A Flask Response object containing the JSON statistics and an HTTP status code 200 (OK), or a 400 error response if an unsupported
+               bucket is requested.
+    """
+    bucket = request.args.get('bucket')
+    if bucket not in (None, 'day'):
+        current_app.logger.error(f"Unsupported stats bucket requested: {bucket}")
+        abort(400, description=f"Unsupported bucket '{bucket}', only 'day' is supported")
+
+    current_app.logger.info("Fetching Todo statistics.")
+    stats = todo_stats.snapshot(by_day=bucket == 'day')
+    return negotiated_response(stats, 200)
+
+@api_bp.route('/todos/changes', methods=['GET'])
+def get_todo_changes():
+    """Retrieve the Todo items created, updated or deleted since a sync token.
+
+    This endpoint serves incremental synchronisation for offline and mobile clients. Without a since parameter it returns every live Todo item,
+    with since=<token> only the items changed after that token, one entry per item: {"id", "op": "upsert", "todo"} with the current state or
+    {"id", "op": "delete"} as a tombstone. The response carries the token for the next call in "next"; while "has_more" is true the client should
+    immediately call again with it.
+
+    Returns:
+        tuple: A Flask Response object containing the changes and an HTTP status code 200 (OK), a 400 error response for a malformed token or
+               limit, or a 410 (Gone) error response if changes after the token were compacted and a full resync is required.
+    """
+    token = request.args.get('since')
+    limit = request.args.get('limit', current_app.config['TODO_SYNC_PAGE_SIZE'], type=int)
+    if limit is None or not 0 < limit <= current_app.config['TODO_SYNC_PAGE_SIZE']:
+        abort(400, description=f"limit must be between 1 and {current_app.config['TODO_SYNC_PAGE_SIZE']}")
+
+    try:
+        since = TodoSyncService.decode_token(token) if token else START
+    except SyncTokenError as err:
+        current_app.logger.error(str(err))
+        abort(400, description=str(err))
+
+    current_app.logger.info(f"Fetching Todo changes after sync position {since}.")
+    try:
+        changes, next_position, has_more = TodoSyncService.get_changes(since, limit)
+    except SyncTokenExpired as err:
+        current_app.logger.warning(f"Expired sync token received: {token}")
+        abort(410, description=str(err))
+    result = {
+        'changes': [
+            {'id': todo_id, 'op': op, 'todo': todo_schema.dump(todo)} if todo is not None else {'id': todo_id, 'op': op}
+            for todo_id, op, todo in changes
+        ],
+        'next': TodoSyncService.encode_token(next_position),
+        'has_more': has_more
+    }
+    current_app.logger.debug(f"Returning {len(changes)} Todo changes.")
+    return negotiated_response(result, 200)
 
 @api_bp.route('/todos/<int:todo_id>', methods=['GET'])
 def get_todo(todo_id):
     """Retrieve a specific Todo item by its ID.
 
     This endpoint fetches a single Todo item from the database based on the provided todo_id. If the item is not found, it returns a 404 error.
-    Otherwise, it serializes the item using todo_schema and returns it as JSON.
+    Otherwise, it serializes the item using todo_schema and returns it as JSON. Archived items are only found when include_archived=true is passed.
 
     Args:
         todo_id (int): The unique identifier of the Todo item to retrieve.
@@ -36,54 +145,55 @@ def get_todo(todo_id):
                if the item is not found.
     """
     current_app.logger.info(f"Fetching Todo item with ID: {todo_id}.")
-    todo = TodoService.get_todo_by_id(todo_id)  # fetch the Todo item by ID; abort with 404 if not found
+    todo = TodoService.get_todo_by_id(todo_id, include_archived=_query_flag('include_archived'))  # fetch the Todo item by ID; abort with 404 if not found
     if not todo:
         current_app.logger.warning(f"Todo item with ID: {todo_id} not found.")
         abort(404, description=f"Todo item with ID {todo_id} not found.")
         
     result = todo_schema.dump(todo) # serialize the Todo object into a JSON-compatible format
     current_app.logger.debug(f"Returning Todo item: {result}")
-    return jsonify(result), 200
+    return negotiated_response(result, 200)
 
 @api_bp.route('/todos', methods=['POST'])
 def create_todo():
     """Create a new Todo item.
 
-    This endpoint accepts JSON data representing a new Todo item. It validates the input data using todo_schema. If validation is successful, a new Todo 
+    This endpoint accepts JSON (or MessagePack/CBOR, see formats.py) data representing a new Todo item. It validates the input data using todo_schema. If validation is successful, a new Todo 
     record is created and saved to the database. The newly created item is then serialized and returned as JSON with an HTTP 201 status code. If input 
     data is missing or validation fails, appropriate error responses are returned.
 
     Returns:
         tuple: A Flask Response object containing the JSON representation of the newly created Todo item and an HTTP status code 201 (Created), or an 
-        error response with status code 400 (Bad Request) if input is invalid or missing.
+        error response with status code 400 (Bad Request) if input is invalid or missing, or 403 (Forbidden) if the tenant's quota is used up.
     """
     current_app.logger.info("Attempting to create a new Todo item.")
-    json_data = request.get_json()
+    json_data = load_request_data()
     if not json_data:
         current_app.logger.error("No input data provided for new Todo item.")
         abort(400, description="No input data provided")
         
     try:
-        # Validate and deserialize input
-        new_todo_obj = todo_schema.load(json_data) # new_todo_obj is now a Todo ORM instance
+        # Validate and deserialize input with the fast path, then build the ORM instance from the plain dict
+        new_todo_obj = Todo(**todo_payload_validator.validate(json_data))
         current_app.logger.debug(f"Validated input data for new Todo: {json_data}")
         
         todo = TodoService.create_todo(new_todo_obj)
         result = todo_schema.dump(todo)
         current_app.logger.info(f"Successfully created Todo item with ID: {todo.id}")
-        return jsonify(result), 201
+        return negotiated_response(result, 201)
         
     except ValidationError as err:
         current_app.logger.error(f"Validation error creating Todo item: {err.messages}")
-        return jsonify(err.messages), 400
+        return negotiated_response(err.messages, 400)
 
 @api_bp.route('/todos/<int:todo_id>', methods=['PUT'])
 def update_todo(todo_id):
     """Update an existing Todo item by its ID.
 
-    This endpoint allows for updating an existing Todo item identified by todo_id. It accepts JSON data containing the fields to be updated. The input 
-    data is validated using todo_schema with partial loading enabled, allowing for updates to a subset of fields. If the item is found and data is valid,
-    the item is updated in the database and the updated item is returned as JSON. Error responses are returned for missing items, missing input data, or
+    This endpoint allows for updating an existing Todo item identified by todo_id. It accepts JSON (or MessagePack/CBOR) data containing the fields to be updated. The input 
+    data is validated using todo_payload_validator with partial loading enabled, allowing for updates to a subset of fields. If the item is found and data is valid,
+    the item is updated in the database and the updated item is returned as JSON. Updates to the same item arriving while it is being written
+    are merged into one write and all of them return the final state. Error responses are returned for missing items, missing input data, or
     validation failures.
 
     Args:
@@ -99,32 +209,33 @@ def update_todo(todo_id):
         current_app.logger.warning(f"Todo item with ID: {todo_id} not found for update.")
         abort(404, description=f"Todo item with ID {todo_id} not found.")
         
-    json_data = request.get_json()
+    json_data = load_request_data()
     if not json_data:
         current_app.logger.error(f"No input data provided for updating Todo item ID: {todo_id}.")
         abort(400, description="No input data provided")
     
     try:
-        # Validate and deserialize input, the schema.load with partial=True will return a new Todo object with validated fields
-        validated_partial_obj = todo_schema.load(json_data, partial=True) # allows partial updates
+        # Validate and deserialize input, partial=True returns a plain dict holding only the validated fields that were sent
+        validated_fields = todo_payload_validator.validate(json_data, partial=True) # allows partial updates
         current_app.logger.debug(f"Validated input data for updating Todo ID {todo_id}: {json_data}")
         
-        # Update todo item using the service
-        updated_todo = TodoService.update_todo(todo_orm_instance, json_data, validated_partial_obj)
-        result = todo_schema.dump(updated_todo)
+        # Update todo item using the service, merged with concurrent updates to the same item (every merged request returns the final state)
+        def apply_update(fields):
+            return todo_schema.dump(TodoService.update_todo(todo_orm_instance, fields, fields)) # reloaded by PK if a wait expired it
+        result = write_coalescer.submit((current_tenant(), todo_id), validated_fields, apply_update)
         current_app.logger.info(f"Successfully updated Todo item with ID: {todo_id}.")
-        return jsonify(result), 200
+        return negotiated_response(result, 200)
         
     except ValidationError as err:
         current_app.logger.error(f"Validation error updating Todo item ID {todo_id}: {err.messages}")
-        return jsonify(err.messages), 400
+        return negotiated_response(err.messages, 400)
 
 @api_bp.route('/todos/<int:todo_id>', methods=['DELETE'])
 def delete_todo(todo_id):
     """Delete a Todo item by its ID.
 
-    This endpoint removes a Todo item from the database based on the provided todo_id. If the item is found, it is deleted, and a confirmation message
-    is returned. If the item is not found, a 404 error is returned.
+    This endpoint soft deletes a Todo item based on the provided todo_id, hiding it from every read until the archival job moves it out of the hot
+    table. If the item is found, it is deleted, and a confirmation message is returned. If the item is not found, a 404 error is returned.
 
     Args:
         todo_id (int): The unique identifier of the Todo item to delete.
@@ -140,4 +251,4 @@ def delete_todo(todo_id):
         
     TodoService.delete_todo(todo)
     current_app.logger.info(f"Successfully deleted Todo item with ID: {todo_id}.")
-    return jsonify({"message": f"Todo item with ID {todo_id} deleted successfully"}), 200
\ No newline at end of file
+    return negotiated_response({"message": f"Todo item with ID {todo_id} deleted successfully"}, 200)
\ No newline at end of file
@@ -0,0 +1,77 @@
+import os
+import click
+from flask.cli import AppGroup
+from flask import current_app
+from app.services.todo_archive_service import TodoArchiveService
+from app.services.todo_stats_service import todo_stats
+from app.services.todo_sync_service import TodoSyncService
+from app.services.todo_transfer_service import TodoTransferService, TransferFormatError
+from app.tenancy import tenant_scope
+
+todos_cli = AppGroup('todos', help='Maintenance commands for Todo data.')
+
+@todos_cli.command('archive')
+@click.option('--days', default=30, show_default=True, help='Archive completed or soft deleted todos older than this many days.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows moved per transaction.')
+def archive_command(days, batch_size):
+    """Move old completed and soft deleted todos into the todos_archive table."""
+    archived = TodoArchiveService.archive_todos(days, batch_size=batch_size)
+    click.echo(f"Archived {archived} todos.")
+
+@todos_cli.command('compact-changes')
+@click.option('--days', default=None, type=int, help='Tombstone retention in days, defaults to TODO_SYNC_RETENTION_DAYS.')
+def compact_changes_command(days):
+    """Remove superseded change-log rows and expired tombstones."""
+    if days is None:
+        days = current_app.config['TODO_SYNC_RETENTION_DAYS']
+    removed = TodoSyncService.compact_changes(days)
+    click.echo(f"Removed {removed} change-log rows.")
+
+@todos_cli.command('reconcile-stats')
+@click.option('--tenant', default=None, help='Tenant to recount, defaults to every tenant.')
+def reconcile_stats_command(tenant):
+    """Recount the todo_stats summary table from the todos tables, run it periodically."""
+    tenants = [tenant] if tenant else todo_stats.tenants()
+    for tenant_id in tenants:
+        todo_stats.reconcile(tenant_id)
+    click.echo(f"Reconciled the statistics of {len(tenants)} tenants.")
+
+def _transfer_format(path, fmt):
+    """The explicit --format, otherwise inferred from the file extension."""
+    return fmt or ('parquet' if os.path.splitext(path)[1].lower() == '.parquet' else 'csv')
+
+@todos_cli.command('export')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet']), default=None, help='Defaults to the file extension, else csv.')
+@click.option('--tenant', default=None, help='Tenant to export, defaults to TENANT_DEFAULT.')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows fetched per batch.')
+def export_command(path, fmt, tenant, batch_size):
+    """Export the live todos of a tenant to a CSV or Parquet file."""
+    fmt = _transfer_format(path, fmt)
+    with tenant_scope(tenant or current_app.config['TENANT_DEFAULT']), open(path, 'wb') as output:
+        try:
+            exported = TodoTransferService.export_todos(output, fmt, batch_size=batch_size,
+                                                        progress=lambda done: click.echo(f"Exported {done} rows...", err=True))
+        except TransferFormatError as err:
+            raise click.UsageError(str(err))
+    click.echo(f"Exported {exported} todos to {path}.")
+
+@todos_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet']), default=None, help='Defaults to the file extension, else csv.')
+@click.option('--tenant', default=None, help='Tenant to import into, defaults to TENANT_DEFAULT.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows validated and inserted per transaction.')
+def import_command(path, fmt, tenant, batch_size):
+    """Create todos from a CSV or Parquet file (title, description and completed columns)."""
+    fmt = _transfer_format(path, fmt)
+    with tenant_scope(tenant or current_app.config['TENANT_DEFAULT']), open(path, 'rb') as source:
+        try:
+            report = TodoTransferService.import_todos(
+                source, fmt, batch_size=batch_size,
+                progress=lambda read, imported: click.echo(f"Read {read} rows, imported {imported}...", err=True)
+            )
+        except TransferFormatError as err:
+            raise click.UsageError(str(err))
+    for row, messages in report['errors'].items():
+        click.echo(f"Row {row} rejected: {messages}", err=True)
+    click.echo(f"Imported {report['imported']} todos, rejected {report['rejected']} rows.")
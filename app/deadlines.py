@@ -0,0 +1,112 @@
+import threading
+import time
+from flask import g, jsonify, current_app, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+QUERY_CANCELED_SQLSTATE = '57014' # PostgreSQL error raised when statement_timeout cancels a query
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of its time budget before or while talking to the database."""
+
+
+class DeadlineQueuePool(QueuePool):
+    """
+    QueuePool whose checkouts wait at most DB_POOL_TIMEOUT seconds, or the time left in the current request's budget if that is shorter.
+
+    Pool events fire only after a checkout and the wait timeout is not public, so this overrides QueuePool's private _do_get and _timeout;
+    requirements.txt pins SQLAlchemy for that reason.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._checkout = threading.local() # timeout of the checkout running on this thread
+        super().__init__(*args, **kwargs)
+
+    @property
+    def _timeout(self):
+        return getattr(self._checkout, 'timeout', self._pool_timeout)
+
+    @_timeout.setter
+    def _timeout(self, value):
+        self._pool_timeout = value
+
+    def _do_get(self):
+        remaining = remaining_seconds()
+        if remaining is None or remaining >= self._pool_timeout:
+            return super()._do_get()
+        if remaining <= 0:
+            raise DeadlineExceeded("Request deadline reached before checking out a connection")
+        self._checkout.timeout = remaining
+        try:
+            return super()._do_get()
+        finally:
+            vars(self._checkout).pop('timeout', None) # _do_get may have recursed, which already cleared it
+
+
+def init_app(app):
+    """Configure per-request deadlines, must run before db.init_app so the engine picks up the pool and statement timeouts.
+
+    Every request gets a budget of REQUEST_DEADLINE_SECONDS. On PostgreSQL each transaction of a request sets statement_timeout to the
+    remaining budget, pool checkouts wait at most DB_POOL_TIMEOUT seconds or the remaining budget if shorter. Work outside a request (migrations, CLI commands, background jobs)
+    keeps the server's statement_timeout. Requests that exceed their budget return 503 with a Retry-After header and are counted in
+    app.extensions['deadlines']['exceeded'].
+    """
+    app.config.setdefault('REQUEST_DEADLINE_SECONDS', 10.0)
+    app.config.setdefault('DB_POOL_TIMEOUT', 5.0)
+    app.config.setdefault('DEADLINE_RETRY_AFTER', 1)
+    app.extensions['deadlines'] = {'lock': threading.Lock(), 'exceeded': 0}
+
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if uri and make_url(uri).get_backend_name() == 'postgresql':
+        engine_options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        engine_options.setdefault('poolclass', DeadlineQueuePool)
+        engine_options.setdefault('pool_timeout', app.config['DB_POOL_TIMEOUT'])
+
+    app.before_request(_start_deadline)
+    app.register_error_handler(DeadlineExceeded, _deadline_exceeded)
+    app.register_error_handler(PoolTimeoutError, _deadline_exceeded)
+    app.register_error_handler(OperationalError, _operational_error)
+
+def _start_deadline():
+    g.deadline = time.monotonic() + current_app.config['REQUEST_DEADLINE_SECONDS']
+
+def lift_deadline():
+    """Exempt the current request from its deadline, for long-running endpoints such as bulk transfers that set no statement_timeout."""
+    g.pop('deadline', None)
+
+def remaining_seconds():
+    """Seconds left in the current request's budget, or None outside of a request."""
+    if not has_request_context() or 'deadline' not in g:
+        return None
+    return g.deadline - time.monotonic()
+
+def _deadline_exceeded(err):
+    state = current_app.extensions['deadlines']
+    with state['lock']:
+        state['exceeded'] += 1
+    current_app.logger.warning(f"Request deadline exceeded: {type(err).__name__}: {err}")
+    response = jsonify({'description': 'The server is overloaded, please retry shortly.'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(current_app.config['DEADLINE_RETRY_AFTER'])
+    return response
+
+def _operational_error(err):
+    orig = err.orig
+    sqlstate = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None) # psycopg2 or psycopg 3
+    if sqlstate == QUERY_CANCELED_SQLSTATE:
+        return _deadline_exceeded(err)
+    raise err # any other database error keeps its normal 500 handling
+
+@event.listens_for(Session, 'after_begin')
+def _apply_statement_timeout(session, transaction, connection):
+    """Limit every statement of a request's transaction to the time the request has left."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline reached before starting a transaction")
+    if connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(remaining * 1000), 1)}")
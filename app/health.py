@@ -0,0 +1,102 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import Blueprint, jsonify, current_app
+from sqlalchemy import text
+from app import db
+
+health_bp = Blueprint('health', __name__)
+
+# A single probe thread per process: a hung database probe is never stacked up behind new ones
+_probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='readiness-probe')
+
+def init_app(app):
+    app.config.setdefault('READINESS_TIMEOUT', 2.0)
+    app.config.setdefault('READINESS_CACHE_SECONDS', 2.0)
+    app.extensions['readiness'] = {'lock': threading.Lock(), 'result': None, 'checked_at': None, 'future': None}
+    app.register_blueprint(health_bp)
+
+def _pool_stats():
+    """Report the connection pool counters that the configured pool class supports."""
+    pool = db.engine.pool
+    stats = {'class': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            stats[name] = counter()
+    return stats
+
+def _probe_database(app):
+    """Check out a pooled connection and run SELECT 1, returning the timings in milliseconds."""
+    with app.app_context():
+        started = time.perf_counter()
+        with db.engine.connect() as connection:
+            checked_out = time.perf_counter()
+            connection.execute(text('SELECT 1'))
+            finished = time.perf_counter()
+        return {
+            'checkout_ms': round((checked_out - started) * 1000, 3),
+            'query_ms': round((finished - checked_out) * 1000, 3),
+            'latency_ms': round((finished - started) * 1000, 3)
+        }
+
+def _check_readiness():
+    app = current_app._get_current_object()
+    state = app.extensions['readiness']
+    previous = state['future']
+    if previous is not None and not previous.done():
+        return False, {'error': 'previous database probe still running'}
+
+    future = state['future'] = _probe_executor.submit(_probe_database, app)
+    try:
+        return True, future.result(timeout=app.config['READINESS_TIMEOUT'])
+    except FutureTimeoutError:
+        return False, {'error': f"database probe timed out after {app.config['READINESS_TIMEOUT']}s"}
+    except Exception as err:
+        app.logger.error(f"Readiness probe failed: {err}")
+        return False, {'error': type(err).__name__}
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness probe.
+
+    Answers from the process alone without any I/O, so a slow or unavailable database never makes the orchestrator restart a healthy process.
+
+    Returns:
+        tuple: A Flask Response object with {"status": "ok"} and an HTTP status code 200 (OK).
+    """
+    return jsonify({'status': 'ok'}), 200
+
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness probe.
+
+    Checks out a pooled connection and runs SELECT 1 within READINESS_TIMEOUT seconds, reporting the database round-trip latency and the pool
+    counters. The result is cached for READINESS_CACHE_SECONDS so frequent probes do not hammer the database.
+
+    Returns:
+        tuple: A Flask Response object with the probe details and an HTTP status code 200 (OK) when the database answered in time, otherwise
+               503 (Service Unavailable). Also 503 as soon as a graceful shutdown starts draining the process.
+    """
+    if current_app.extensions['shutdown']['draining']:
+        return jsonify({'status': 'draining'}), 503 # take this process out of rotation before it stops
+
+    state = current_app.extensions['readiness']
+    with state['lock']:
+        now = time.monotonic()
+        cached = state['checked_at'] is not None and now - state['checked_at'] < current_app.config['READINESS_CACHE_SECONDS']
+        if not cached:
+            state['result'] = _check_readiness()
+            state['checked_at'] = time.monotonic()
+        ready, database = state['result']
+
+    body = {
+        'status': 'ready' if ready else 'unavailable',
+        'database': database,
+        'pool': _pool_stats(),
+        'deadline_exceeded': current_app.extensions['deadlines']['exceeded'], # requests answered 503 because they ran out of time
+        'cached': cached
+    }
+    if not ready:
+        current_app.logger.warning(f"Readiness probe failing: {database}")
+    return jsonify(body), 200 if ready else 503
@@ -1,15 +1,26 @@
 from . import db
+from .tenancy import DEFAULT_TENANT
+from sqlalchemy import DDL, BigInteger, event
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 
 class Todo(db.Model):
     __tablename__ = 'todos'
+    __table_args__ = (
+        # Every read is scoped to one tenant's live rows and ordered by ID, the partial index skips soft deleted rows
+        db.Index('ix_todos_tenant_id_live', 'tenant_id', 'id',
+                 postgresql_where=db.text('deleted_at IS NULL'), sqlite_where=db.text('deleted_at IS NULL')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.String(64), nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=True)
     completed = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=func.now())
+    deleted_at = db.Column(db.DateTime(timezone=True), nullable=True) # soft delete marker, set instead of removing the row
     
     def __repr__(self):
         return f'<Todo {self.id}: {self.title}>'
@@ -22,4 +33,132 @@ class Todo(db.Model):
             'completed': self.completed,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+
+class TodoArchive(db.Model):
+    """
+    Cold storage for old completed and soft deleted todos, moved out of the hot todos table by the archival job.
+
+    On PostgreSQL the table is range-partitioned by created_at (see migrations), which is why created_at is part of the primary key.
+    """
+    __tablename__ = 'todos_archive'
+    __table_args__ = (
+        db.Index('ix_todos_archive_tenant_id_id', 'tenant_id', 'id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'} # db.create_all() builds the same table as the migration
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    created_at = db.Column(db.DateTime(timezone=True), primary_key=True)
+    tenant_id = db.Column(db.String(64), nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    title = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    completed = db.Column(db.Boolean, default=False, nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    deleted_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    archived_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f'<TodoArchive {self.id}: {self.title}>'
+
+# Same catch-all partition as the migration, monthly partitions are added by the archival job
+event.listen(TodoArchive.__table__, 'after_create',
+             DDL("CREATE TABLE todos_archive_default PARTITION OF todos_archive DEFAULT").execute_if(dialect='postgresql'))
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True) # pending, running or failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    locked_until = db.Column(db.DateTime, nullable=True) # naive UTC, a job is claimable again once its lease expires
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f'<Job {self.id}: {self.name} ({self.status})>'
+
+
+class current_xid(FunctionElement):
+    """The ID of the writing transaction on PostgreSQL, 0 on SQLite where write transactions are serialized and commit in seq order."""
+    type = BigInteger()
+    inherit_cache = True
+
+@compiles(current_xid)
+def _compile_current_xid(element, compiler, **kw):
+    return '0'
+
+@compiles(current_xid, 'postgresql')
+def _compile_current_xid_postgresql(element, compiler, **kw):
+    return 'txid_current()'
+
+
+class TodoChange(db.Model):
+    """
+    Append-only change log of Todo writes used by the delta-sync endpoint, (xid, seq) is the sync position.
+
+    On PostgreSQL seq is assigned at insert but transactions commit in any order, so a sync only reads changes of transactions older than
+    every running one and orders them by the writing transaction's ID first (see TodoSyncService.get_changes). Compaction keeps only the
+    latest row per todo and drops old tombstones, see TodoSyncService.compact_changes.
+    """
+    __tablename__ = 'todo_changes'
+    __table_args__ = (
+        db.Index('ix_todo_changes_tenant_id_xid_seq', 'tenant_id', 'xid', 'seq'), # a sync reads one tenant's changes after a position
+        {'sqlite_autoincrement': True} # never reuse a seq on SQLite, even after compaction deletes the newest rows
+    )
+    
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    tenant_id = db.Column(db.String(64), nullable=False, default=DEFAULT_TENANT, server_default=DEFAULT_TENANT)
+    todo_id = db.Column(db.Integer, nullable=False, index=True)
+    op = db.Column(db.String(10), nullable=False) # 'upsert' or 'delete' (tombstone)
+    changed_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    xid = db.Column(db.BigInteger, nullable=False, default=current_xid(), server_default='0') # writing transaction, rows from before the column are 0
+    
+    def __repr__(self):
+        return f'<TodoChange {self.seq}: {self.op} {self.todo_id}>'
+
+
+class TodoSyncWatermark(db.Model):
+    """
+    The highest change-log position of a tenant whose tombstone was removed by compaction, sync tokens before it must resync.
+    """
+    __tablename__ = 'todo_sync_watermarks'
+    
+    tenant_id = db.Column(db.String(64), primary_key=True)
+    xid = db.Column(db.BigInteger, nullable=False)
+    seq = db.Column(db.BigInteger, nullable=False)
+    
+    def __repr__(self):
+        return f'<TodoSyncWatermark {self.tenant_id}: {self.xid}.{self.seq}>'
+
+
+class TenantDataVersion(db.Model):
+    """
+    Counter bumped by every transaction that changes what a tenant can read, the response cache keys entries on it in every process.
+    """
+    __tablename__ = 'tenant_data_versions'
+    
+    tenant_id = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<TenantDataVersion {self.tenant_id}: {self.version}>'
+
+
+class TodoStat(db.Model):
+    """
+    Live todo counts of one tenant and created_at day, adjusted in the transaction of every write (see TodoStats).
+
+    Archived todos are counted, soft deleted ones are not. The day is the 'YYYY-MM-DD' date of created_at, '' for todos without one.
+    """
+    __tablename__ = 'todo_stats'
+    
+    tenant_id = db.Column(db.String(64), primary_key=True)
+    day = db.Column(db.String(10), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<TodoStat {self.tenant_id} {self.day}: {self.completed}/{self.total}>'
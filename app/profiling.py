@@ -0,0 +1,138 @@
+import atexit
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from flask import g, request, current_app
+
+def init_app(app):
+    """Install the guarded per-request profiler and, optionally, the background sampling profiler.
+
+    A request is profiled with cProfile only when it carries PROFILING_SECRET in the PROFILING_HEADER header. The secret is never accepted
+    in the query string, where it would end up in access logs and Referer headers. The request's stats are stored as a .prof file in
+    PROFILING_DIR and the file name is returned in the X-Profile-Stats header; sending X-Profile-Output: text returns the top functions as
+    plain text instead of the normal response body.
+    """
+    app.config.setdefault('PROFILING_SECRET', None)
+    app.config.setdefault('PROFILING_HEADER', 'X-Profile')
+    app.config.setdefault('PROFILING_DIR', os.path.join(os.path.dirname(app.root_path), 'logs', 'profiles'))
+    app.config.setdefault('PROFILING_SAMPLER_ENABLED', False)
+    app.config.setdefault('PROFILING_SAMPLE_INTERVAL', 0.01)
+    app.config.setdefault('PROFILING_SAMPLE_DUMP_INTERVAL', 60.0)
+    app.config.setdefault('PROFILING_SAMPLE_FILE', os.path.join(os.path.dirname(app.root_path), 'logs', 'profile-samples.folded'))
+
+    if app.config['PROFILING_SECRET']:
+        app.before_request(_start_request_profile)
+        app.after_request(_finish_request_profile)
+        app.teardown_request(_discard_request_profile)
+        app.logger.info("Per-request profiling enabled.")
+
+    if app.config['PROFILING_SAMPLER_ENABLED']:
+        sampler = SamplingProfiler(app.config['PROFILING_SAMPLE_INTERVAL'], app.config['PROFILING_SAMPLE_DUMP_INTERVAL'],
+                                   app.config['PROFILING_SAMPLE_FILE'])
+        sampler.start()
+        atexit.register(sampler.stop)
+        app.extensions['sampling_profiler'] = sampler
+        app.logger.info(f"Sampling profiler writing collapsed stacks to {app.config['PROFILING_SAMPLE_FILE']}.")
+
+# --- Per-request cProfile ---
+
+def _start_request_profile():
+    token = request.headers.get(current_app.config['PROFILING_HEADER'])
+    if not token or not hmac.compare_digest(token.encode(), current_app.config['PROFILING_SECRET'].encode()):
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        current_app.logger.warning("Profiling skipped, another profiler is already active.")
+        return
+    g.profiler = profiler
+
+def _finish_request_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+
+    profile_dir = current_app.config['PROFILING_DIR']
+    os.makedirs(profile_dir, exist_ok=True)
+    filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unknown'}-{os.getpid()}-{threading.get_ident()}.prof"
+    profiler.dump_stats(os.path.join(profile_dir, filename)) # open with pstats or snakeviz
+    current_app.logger.info(f"Stored request profile {filename} for {request.method} {request.path}.")
+
+    if request.headers.get('X-Profile-Output') == 'text':
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(40)
+        response = current_app.response_class(output.getvalue(), mimetype='text/plain')
+    response.headers['X-Profile-Stats'] = filename
+    return response
+
+def _discard_request_profile(exc):
+    profiler = g.pop('profiler', None) # only left behind when the request failed before after_request
+    if profiler is not None:
+        profiler.disable()
+
+# --- Background sampling profiler ---
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler that periodically samples the stacks of all threads.
+
+    Samples are aggregated in memory and written every dump_interval seconds to output_file in collapsed-stack format
+    ("frame;frame;frame count" per line), which flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, interval, dump_interval, output_file):
+        self.interval = interval
+        self.dump_interval = dump_interval
+        self.output_file = output_file
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval * 10)
+        self.dump()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        next_dump = time.monotonic() + self.dump_interval
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[self._collapse(frame)] += 1
+            if time.monotonic() >= next_dump:
+                self.dump()
+                next_dump = time.monotonic() + self.dump_interval
+
+    @staticmethod
+    def _collapse(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(stack)) # root first, as expected by flame graph tools
+
+    def dump(self):
+        """Write the aggregated samples collected so far, replacing the previous dump."""
+        if not self.samples:
+            return
+        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+        temp_file = f"{self.output_file}.tmp"
+        with open(temp_file, 'w') as output:
+            for stack, count in self.samples.most_common():
+                output.write(f"{stack} {count}\n")
+        os.replace(temp_file, self.output_file) # readers never see a half-written file
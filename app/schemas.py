@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate, ValidationError, post_load, validates
+from marshmallow import Schema, fields, validate, ValidationError, post_load, validates, missing
 from .models import Todo
 
 class TodoSchema(Schema):
@@ -20,4 +20,93 @@ class TodoSchema(Schema):
     
 # Create schema instances for different use cases
 todo_schema = TodoSchema()           # for single Todo serialization/deserialization
-todos_schema = TodoSchema(many=True) # for multiple Todos
\ No newline at end of file
+todos_schema = TodoSchema(many=True) # for multiple Todos
+
+class TodoPayloadValidator:
+    """
+    Validation fast path for request payloads that returns a plain dict instead of a Todo ORM instance.
+
+    The schema's load fields, field validators and @validates hooks are resolved once at construction, so a call only runs the
+    per-field deserialize/validate work: no schema hooks, no post_load ORM instantiation and no session interaction. Error messages
+    and the error dict layout are identical to schema.load().
+    """
+
+    def __init__(self, schema):
+        field_hooks = {}
+        for attr_name in dir(type(schema)):
+            hook = getattr(getattr(schema, attr_name, None), '__marshmallow_hook__', None)
+            if hook and 'validates' in hook:
+                field_hooks.setdefault(hook['validates']['field_name'], []).append(getattr(schema, attr_name))
+
+        self._fields = tuple(
+            (name, field, field_hooks.get(name, ()), field.load_default)
+            for name, field in schema.load_fields.items()
+        )
+        self._known = frozenset(schema.load_fields)
+        self._type_error = schema.error_messages['type']
+        self._unknown_error = schema.error_messages['unknown']
+
+    def validate(self, data, partial=False):
+        """
+        Validates and deserializes a payload.
+
+        Args:
+            data (dict): The decoded request body.
+            partial (bool): If True, required fields may be omitted (PUT semantics).
+
+        Returns:
+            dict: The deserialized values of the fields present in data, plus load defaults when partial is False.
+
+        Raises:
+            ValidationError: With the same messages dict that schema.load() would produce.
+        """
+        if not isinstance(data, dict):
+            raise ValidationError({'_schema': [self._type_error]})
+
+        result, errors = {}, {}
+        for name, field, hooks, load_default in self._fields:
+            if name not in data:
+                if partial:
+                    continue
+                if field.required:
+                    errors[name] = [field.error_messages['required']]
+                elif load_default is not missing:
+                    result[name] = load_default() if callable(load_default) else load_default
+                continue
+            try:
+                value = field.deserialize(data[name], name, data) # runs the field's own validators
+                for hook in hooks:
+                    hook(value)
+            except ValidationError as err:
+                errors[name] = err.messages if isinstance(err.messages, list) else [err.messages]
+                continue
+            result[name] = value
+
+        for name in data.keys() - self._known:
+            errors[name] = [self._unknown_error]
+        if errors:
+            raise ValidationError(errors)
+        return result
+
+    def validate_many(self, items, partial=False):
+        """
+        Validates a batch of payloads, keeping the valid ones instead of failing the whole batch.
+
+        Args:
+            items (list): The decoded payloads.
+            partial (bool): If True, required fields may be omitted (PUT semantics).
+
+        Returns:
+            tuple: (valid, errors) where valid lists the deserialized dicts in input order and errors maps the index of every invalid item
+                   to its messages, the layout of schema.load(many=True) errors.
+        """
+        valid, errors = [], {}
+        for index, data in enumerate(items):
+            try:
+                valid.append(self.validate(data, partial=partial))
+            except ValidationError as err:
+                errors[index] = err.messages
+        return valid, errors
+
+
+todo_payload_validator = TodoPayloadValidator(todo_schema) # plain dict validation for the API routes
@@ -0,0 +1,278 @@
+import queue
+import threading
+import time
+import atexit
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models import Job
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, or_
+
+_STOP = object() # sentinel telling a worker thread to exit
+_WAKE = object() # sentinel telling a worker thread to poll the jobs table (durable mode)
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None) # Job.locked_until is stored as naive UTC
+
+
+class _QueueState:
+    """
+    Worker threads and the bounded in-memory queue for one Flask application, stored in app.extensions['job_queue'].
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue(maxsize=app.config['JOB_QUEUE_MAX_SIZE'])
+        self.threads = []
+        self.lock = threading.Lock()
+        self.accepting = True
+
+
+class JobQueue:
+    """
+    In-process background work queue for side effects that should run after a write has been committed.
+
+    Jobs are enqueued while the write transaction is still open and only dispatched from the session's after_commit hook, so a rolled back
+    write never triggers its side effects. A bounded pool of JOB_QUEUE_WORKERS daemon threads consumes a queue of at most
+    JOB_QUEUE_MAX_SIZE items. When the queue stays full for JOB_QUEUE_SUBMIT_TIMEOUT seconds the job runs inline on the request thread,
+    which slows producers down instead of dropping work.
+
+    With JOB_QUEUE_DURABLE enabled the job is inserted into the jobs table inside the write transaction itself (an outbox), and workers
+    claim rows with a lease. A job is deleted only after its handler succeeds, so jobs survive crashes and are executed at least once;
+    handlers must therefore be idempotent. Durable workers start polling on the first request a process serves (the readiness probe after a
+    restart), which picks up jobs left over from a crash and expired leases without waiting for a new write. With JOB_QUEUE_EAGER enabled
+    (used by tests) jobs run synchronously right after the commit.
+    """
+
+    def __init__(self, app=None):
+        self._handlers = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOB_QUEUE_WORKERS', 4)
+        app.config.setdefault('JOB_QUEUE_MAX_SIZE', 1000)
+        app.config.setdefault('JOB_QUEUE_SUBMIT_TIMEOUT', 1.0)
+        app.config.setdefault('JOB_QUEUE_DURABLE', False)
+        app.config.setdefault('JOB_QUEUE_EAGER', False)
+        app.config.setdefault('JOB_QUEUE_POLL_INTERVAL', 5.0)
+        app.config.setdefault('JOB_QUEUE_LEASE_SECONDS', 60)
+        app.config.setdefault('JOB_QUEUE_MAX_ATTEMPTS', 5)
+        app.config.setdefault('JOB_QUEUE_SHUTDOWN_TIMEOUT', 10.0)
+
+        state = _QueueState(app)
+        app.extensions['job_queue'] = state
+        atexit.register(self._shutdown_state, state)
+        if self._start_durable_workers not in app.before_request_funcs.get(None, []): # init_app also resets the state of a running app
+            app.before_request(self._start_durable_workers)
+
+    def task(self, name):
+        """
+        Registers a function as the handler for jobs with the given name.
+
+        Handlers are called with the job payload as keyword arguments inside a fresh application context.
+
+        Args:
+            name (str): The job name used with enqueue().
+        """
+        def decorator(func):
+            self._handlers[name] = func
+            return func
+        return decorator
+
+    def enqueue(self, name, **payload):
+        """
+        Schedules a job to run once the current database transaction commits.
+
+        Args:
+            name (str): The name of a handler registered with task().
+            **payload: JSON-serializable keyword arguments passed to the handler.
+        """
+        if name not in self._handlers:
+            raise KeyError(f"No job handler registered for '{name}'")
+
+        session = db.session()
+        if not session.in_transaction():
+            session.begin() # tie the job to a transaction so a rollback can discard it
+        if current_app.config['JOB_QUEUE_DURABLE']:
+            session.add(Job(name=name, payload=payload)) # committed atomically with the write that produced it
+            session.info['job_queue_wake'] = True
+        else:
+            session.info.setdefault('job_queue_pending', []).append((name, payload))
+
+    # --- Dispatch ---
+
+    def _dispatch(self, session):
+        pending = session.info.pop('job_queue_pending', [])
+        wake = session.info.pop('job_queue_wake', False)
+        if not pending and not wake:
+            return
+
+        state = current_app.extensions['job_queue']
+        app = state.app
+        if app.config['JOB_QUEUE_EAGER'] or not state.accepting:
+            for name, payload in pending:
+                self._run(app, name, payload)
+            if wake:
+                self._run_durable_jobs(app)
+            return
+
+        self._ensure_workers(state)
+        for name, payload in pending:
+            try:
+                state.queue.put((name, payload), timeout=app.config['JOB_QUEUE_SUBMIT_TIMEOUT'])
+            except queue.Full:
+                app.logger.warning(f"JobQueue: Queue full, running job '{name}' on the request thread.")
+                self._run(app, name, payload)
+        if wake:
+            try:
+                state.queue.put_nowait(_WAKE)
+            except queue.Full:
+                pass # the job is persisted, a worker will find it on its next poll
+
+    def _start_durable_workers(self):
+        # Not started in init_app: CLI commands (e.g. 'flask db upgrade') and pre-forking servers create the app without serving requests
+        state = current_app.extensions['job_queue']
+        if state.threads or not state.app.config['JOB_QUEUE_DURABLE'] or state.app.config['JOB_QUEUE_EAGER']:
+            return
+        self._ensure_workers(state)
+        try:
+            state.queue.put_nowait(_WAKE) # poll right away instead of after JOB_QUEUE_POLL_INTERVAL
+        except queue.Full:
+            pass
+
+    def _ensure_workers(self, state):
+        with state.lock:
+            if state.threads or not state.accepting:
+                return
+            for index in range(state.app.config['JOB_QUEUE_WORKERS']):
+                thread = threading.Thread(target=self._worker, args=(state,), name=f'job-queue-{index}', daemon=True)
+                thread.start()
+                state.threads.append(thread)
+            state.app.logger.info(f"JobQueue: Started {len(state.threads)} worker threads.")
+
+    def _worker(self, state):
+        app = state.app
+        durable = app.config['JOB_QUEUE_DURABLE']
+        while True:
+            try:
+                item = state.queue.get(timeout=app.config['JOB_QUEUE_POLL_INTERVAL'] if durable else None)
+            except queue.Empty:
+                item = _WAKE # periodic poll picks up jobs from other processes and expired leases
+            if item is _STOP:
+                return
+            if item is _WAKE:
+                if durable:
+                    self._run_durable_jobs(app)
+            else:
+                self._run(app, *item)
+
+    def _run(self, app, name, payload):
+        with app.app_context():
+            try:
+                self._handlers[name](**payload)
+            except Exception:
+                app.logger.exception(f"JobQueue: Job '{name}' failed.")
+
+    # --- Durable mode ---
+
+    def _claim(self, lease_seconds):
+        """Claims the oldest runnable job by conditionally moving it to 'running', returns it or None."""
+        now = _utcnow()
+        runnable = or_(Job.status == 'pending', Job.status == 'running')
+        candidates = (db.session.query(Job.id)
+                      .filter(runnable, or_(Job.locked_until.is_(None), Job.locked_until < now))
+                      .order_by(Job.id)
+                      .limit(10)
+                      .all())
+        for (job_id,) in candidates:
+            claimed = (db.session.query(Job)
+                       .filter(Job.id == job_id, runnable, or_(Job.locked_until.is_(None), Job.locked_until < now))
+                       .update({Job.status: 'running',
+                                Job.locked_until: now + timedelta(seconds=lease_seconds),
+                                Job.attempts: Job.attempts + 1}, synchronize_session=False))
+            db.session.commit()
+            if claimed:
+                return db.session.get(Job, job_id)
+        return None
+
+    def _run_durable_jobs(self, app):
+        with app.app_context():
+            while True:
+                job = self._claim(app.config['JOB_QUEUE_LEASE_SECONDS'])
+                if job is None:
+                    return
+                handler = self._handlers.get(job.name)
+                try:
+                    if handler is None:
+                        raise KeyError(f"No job handler registered for '{job.name}'")
+                    handler(**job.payload)
+                except Exception as err:
+                    db.session.rollback()
+                    app.logger.exception(f"JobQueue: Durable job {job.id} ('{job.name}') failed on attempt {job.attempts}.")
+                    job.last_error = repr(err)
+                    if job.attempts >= app.config['JOB_QUEUE_MAX_ATTEMPTS']:
+                        job.status = 'failed'
+                    else:
+                        job.status = 'pending'
+                        job.locked_until = _utcnow() + timedelta(seconds=2 ** job.attempts) # exponential backoff
+                else:
+                    db.session.delete(job)
+                db.session.commit()
+
+    # --- Shutdown ---
+
+    def shutdown(self, timeout=None):
+        """
+        Stops accepting queued work and waits for the workers to drain the queue.
+
+        Jobs committed after shutdown begins run inline on the committing thread.
+
+        Args:
+            timeout (float): Seconds to wait for the workers, defaults to JOB_QUEUE_SHUTDOWN_TIMEOUT.
+
+        Returns:
+            bool: True if every worker finished within the timeout.
+        """
+        return self._shutdown_state(current_app.extensions['job_queue'], timeout)
+
+    @staticmethod
+    def _shutdown_state(state, timeout=None):
+        with state.lock:
+            if not state.accepting:
+                return not any(thread.is_alive() for thread in state.threads)
+            state.accepting = False
+            threads = list(state.threads)
+        if not threads:
+            return True
+
+        if timeout is None:
+            timeout = state.app.config['JOB_QUEUE_SHUTDOWN_TIMEOUT']
+        deadline = time.monotonic() + timeout
+        state.app.logger.info(f"JobQueue: Draining {state.queue.qsize()} queued jobs.")
+        for _ in threads:
+            try:
+                state.queue.put(_STOP, timeout=max(deadline - time.monotonic(), 0)) # queued behind the remaining jobs
+            except queue.Full:
+                break
+        for thread in threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        drained = not any(thread.is_alive() for thread in threads)
+        if not drained:
+            state.app.logger.warning("JobQueue: Shutdown timeout reached with jobs still running.")
+        return drained
+
+
+job_queue = JobQueue()
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_after_commit(session):
+    job_queue._dispatch(session)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_rollback(session, previous_transaction):
+    if session.in_transaction():
+        return # only a savepoint was rolled back, the outer transaction may still commit
+    session.info.pop('job_queue_pending', None) # side effects of a rolled back write must never run
+    session.info.pop('job_queue_wake', None)
@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import OrderedDict
+from app import db
+from app.models import TenantDataVersion
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+class _CacheState:
+    """
+    Cached responses of one Flask application, stored in app.extensions['response_cache'].
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict() # key -> (body, mimetype, stored_at), least recently used first
+        self.size = 0                # total bytes of the cached bodies
+        self.versions = {}           # tenant ID -> (data version, monotonic time it was read)
+        self.hits = 0
+        self.misses = 0
+
+
+class ResponseCache:
+    """
+    LRU cache of fully encoded response bodies, bounded by their total size in bytes.
+
+    Entries are keyed on the tenant, its data version, the request path with its query parameters and the negotiated mimetype. The version
+    lives in the tenant_data_versions table: every write that changes what a tenant can read (TodoService writes, imports, archival) bumps it
+    inside its own transaction. Each process reads a tenant's version by primary key at most every RESPONSE_CACHE_VERSION_CHECK_MS
+    milliseconds, and forgets it as soon as one of its own writes commits. A write committed by another worker process therefore invalidates
+    this process's entries within that interval, and writes of this process immediately. Entries of old versions are never hit again and
+    leave through LRU eviction. RESPONSE_CACHE_TTL optionally bounds the age of an entry, a size of 0 disables the cache and the version bumps.
+
+    The bump locks the tenant's version row until the write commits, so the writes of one tenant (every write with the default single
+    tenant) are serialized on PostgreSQL while the cache is enabled.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_MAX_BYTES', 0)
+        app.config.setdefault('RESPONSE_CACHE_MAX_ENTRY_BYTES', 4 * 1024 * 1024)
+        app.config.setdefault('RESPONSE_CACHE_TTL', 0)
+        app.config.setdefault('RESPONSE_CACHE_VERSION_CHECK_MS', 0)
+        app.extensions['response_cache'] = _CacheState()
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['response_cache']
+
+    @staticmethod
+    def enabled():
+        return current_app.config['RESPONSE_CACHE_MAX_BYTES'] > 0
+
+    def key(self, tenant_id, path, mimetype):
+        """
+        Builds the cache key of a response from the tenant's current data version, read it before querying the data it caches.
+
+        Args:
+            tenant_id (str): The tenant the response belongs to.
+            path (str): The request path including its query string, with the parameters in a canonical order.
+            mimetype (str): The negotiated response mimetype.
+
+        Returns:
+            tuple: The cache key.
+        """
+        state = self._state()
+        now = time.monotonic()
+        with state.lock:
+            version, checked_at = state.versions.get(tenant_id, (None, None))
+        if checked_at is None or now - checked_at >= current_app.config['RESPONSE_CACHE_VERSION_CHECK_MS'] / 1000:
+            version = db.session.scalar(select(TenantDataVersion.version).where(TenantDataVersion.tenant_id == tenant_id)) or 0
+            with state.lock:
+                state.versions[tenant_id] = (version, now)
+        return tenant_id, version, path, mimetype
+
+    def get(self, key):
+        """
+        Looks up a cached response.
+
+        Args:
+            key (tuple): The key returned by key().
+
+        Returns:
+            tuple: The cached (body, mimetype), or None on a miss or an expired entry.
+        """
+        state = self._state()
+        ttl = current_app.config['RESPONSE_CACHE_TTL']
+        with state.lock:
+            entry = state.entries.get(key)
+            if entry is not None and ttl and time.monotonic() - entry[2] > ttl:
+                self._drop(state, key)
+                entry = None
+            if entry is None:
+                state.misses += 1
+                return None
+            state.entries.move_to_end(key)
+            state.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key, body, mimetype):
+        """
+        Stores an encoded response body, evicting the least recently used entries beyond RESPONSE_CACHE_MAX_BYTES.
+
+        Args:
+            key (tuple): The key returned by key().
+            body (bytes): The encoded response body.
+            mimetype (str): The response mimetype.
+        """
+        max_bytes = current_app.config['RESPONSE_CACHE_MAX_BYTES']
+        if len(body) > min(current_app.config['RESPONSE_CACHE_MAX_ENTRY_BYTES'], max_bytes):
+            return # one huge list would evict everything else
+        state = self._state()
+        with state.lock:
+            if key in state.entries:
+                self._drop(state, key)
+            state.entries[key] = (body, mimetype, time.monotonic())
+            state.size += len(body)
+            while state.size > max_bytes:
+                self._drop(state, next(iter(state.entries)))
+
+    @staticmethod
+    def _drop(state, key):
+        body = state.entries.pop(key)[0]
+        state.size -= len(body)
+
+    def bump_version(self, tenant_id):
+        """
+        Invalidates every cached response of a tenant, in every process, once the current write transaction commits. Does nothing while the
+        cache is disabled.
+
+        Call it right before the commit: on PostgreSQL the version row stays locked until then, serializing the tenant's writers.
+
+        Args:
+            tenant_id (str): The tenant whose data changes.
+        """
+        if not self.enabled():
+            return
+        table = TenantDataVersion.__table__
+        upsert = (postgresql.insert if db.session.get_bind().dialect.name == 'postgresql' else sqlite.insert)(table)
+        db.session.execute(upsert.values(tenant_id=tenant_id, version=1)
+                           .on_conflict_do_update(index_elements=[table.c.tenant_id], set_={'version': table.c.version + 1}))
+        db.session.info.setdefault('response_cache_bumped', set()).add(tenant_id) # forgotten locally on commit, see _forget_bumped
+
+    def _forget(self, tenant_ids):
+        state = self._state()
+        with state.lock:
+            for tenant_id in tenant_ids:
+                state.versions.pop(tenant_id, None) # the next read fetches the committed version
+            for key in [key for key in state.entries if key[0] in tenant_ids]: # stale from the commit on, free their space now
+                self._drop(state, key)
+
+    def clear(self):
+        """
+        Drops every cached response of this process.
+        """
+        state = self._state()
+        with state.lock:
+            state.entries.clear()
+            state.versions.clear()
+            state.size = 0
+
+    def stats(self):
+        """
+        Reports the cache occupancy and effectiveness.
+
+        Returns:
+            dict: The number of entries, their total bytes and the hit and miss counters.
+        """
+        state = self._state()
+        with state.lock:
+            return {'entries': len(state.entries), 'bytes': state.size, 'hits': state.hits, 'misses': state.misses}
+
+
+response_cache = ResponseCache()
+
+@event.listens_for(Session, 'after_commit')
+def _forget_bumped(session):
+    tenant_ids = session.info.pop('response_cache_bumped', None)
+    if tenant_ids:
+        response_cache._forget(tenant_ids)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_bumped(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop('response_cache_bumped', None) # the version was not bumped, the cached responses stay valid
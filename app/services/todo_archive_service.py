@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models import Todo, TodoArchive, TodoChange
+from app.services.response_cache import response_cache
+from flask import current_app
+from sqlalchemy import DateTime, and_, delete, func, insert, literal_column, or_, select
+
+ARCHIVED_COLUMNS = ('id', 'tenant_id', 'title', 'description', 'completed', 'created_at', 'updated_at', 'deleted_at')
+
+class TodoArchiveService:
+    """
+    Service class for moving old completed and soft deleted todos out of the hot todos table.
+
+    Keeping only live, recently touched rows in the todos table bounds the working set every list query scans, while archived rows stay
+    available through the include_archived option of the API. Archival is maintenance work and runs across all tenants.
+    """
+
+    @staticmethod
+    def _archivable(cutoff):
+        """Rows completed and untouched since the cutoff, or soft deleted before it."""
+        return or_(
+            and_(Todo.deleted_at.is_(None), Todo.completed.is_(True), func.coalesce(Todo.updated_at, Todo.created_at) < cutoff),
+            Todo.deleted_at < cutoff
+        )
+
+    @staticmethod
+    def _archived_created_at():
+        """created_at as stored in the archive, where it is part of the primary key and the partition key."""
+        return func.coalesce(Todo.created_at, func.now())
+
+    @staticmethod
+    def _partition_ddl(todo_ids):
+        """
+        A SELECT returning one CREATE TABLE statement per monthly todos_archive partition the given rows need (PostgreSQL only).
+
+        Months are taken in UTC from the same coalesced created_at the rows are archived with, a row without created_at landing in the
+        default partition would make creating its month's partition fail later. The bounds are the UTC month starts as timestamptz and the
+        end is computed with interval arithmetic, so partitions neither depend on the session time zone nor shift across DST changes.
+        format() quotes the partition name and bounds.
+
+        Args:
+            todo_ids (list): IDs of the todos about to be archived.
+        """
+        created_at_utc = func.timezone('UTC', TodoArchiveService._archived_created_at()) # timestamp without time zone, UTC wall clock
+        months = select(func.date_trunc('month', created_at_utc, type_=DateTime).label('month')).where(Todo.id.in_(todo_ids)).distinct().subquery()
+        return select(func.format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF todos_archive FOR VALUES FROM (%L) TO (%L)',
+            func.concat('todos_archive_y', func.to_char(months.c.month, 'YYYY"m"MM')),
+            func.timezone('UTC', months.c.month),                                       # back to timestamptz, the partition key type
+            func.timezone('UTC', months.c.month + literal_column("interval '1 month'"))
+        ))
+
+    @staticmethod
+    def _ensure_partitions(todo_ids):
+        """
+        Creates the monthly todos_archive partitions needed for the given rows (PostgreSQL only).
+
+        Args:
+            todo_ids (list): IDs of the todos about to be archived.
+        """
+        for ddl in db.session.execute(TodoArchiveService._partition_ddl(todo_ids)).scalars().all():
+            db.session.connection().exec_driver_sql(ddl) # generated and quoted by the database, DDL takes no bind parameters
+
+    @staticmethod
+    def archive_todos(older_than_days, batch_size=1000):
+        """
+        Moves old completed and soft deleted todos into the todos_archive table in batches.
+
+        Each batch is copied with INSERT ... SELECT and removed from the hot table in the same transaction.
+
+        Args:
+            older_than_days (int): Minimum age in days since the last update (completed) or deletion (soft deleted).
+            batch_size (int): Number of rows moved per transaction.
+
+        Returns:
+            int: The total number of archived todos.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        is_postgres = db.engine.dialect.name == 'postgresql'
+        columns = [getattr(Todo, name) for name in ARCHIVED_COLUMNS]
+        columns[ARCHIVED_COLUMNS.index('created_at')] = TodoArchiveService._archived_created_at()
+        archived = 0
+
+        current_app.logger.info(f"TodoArchiveService: Archiving todos older than {older_than_days} days.")
+        while True:
+            rows = db.session.execute(
+                select(Todo.id, Todo.tenant_id).where(TodoArchiveService._archivable(cutoff)).order_by(Todo.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            todo_ids = [todo_id for todo_id, _ in rows]
+
+            if is_postgres:
+                TodoArchiveService._ensure_partitions(todo_ids)
+            db.session.execute(insert(TodoArchive).from_select(
+                list(ARCHIVED_COLUMNS), select(*columns).where(Todo.id.in_(todo_ids))
+            ))
+            db.session.execute(delete(Todo).where(Todo.id.in_(todo_ids)))
+            db.session.execute(insert(TodoChange), [ # tombstones for sync clients
+                {'tenant_id': tenant_id, 'todo_id': todo_id, 'op': 'delete'} for todo_id, tenant_id in rows
+            ])
+            for tenant_id in sorted({tenant_id for _, tenant_id in rows}): # archived rows leave their tenant's default list, sorted to lock version rows in one order
+                response_cache.bump_version(tenant_id)
+            db.session.commit()
+            archived += len(todo_ids)
+            current_app.logger.debug(f"TodoArchiveService: Archived batch of {len(todo_ids)} todos.")
+
+        current_app.logger.info(f"TodoArchiveService: Archived {archived} todos.")
+        return archived
@@ -1,37 +1,113 @@
 from app import db
-from app.models import Todo
+from app.models import Todo, TodoArchive, TodoChange
+from app.services.job_queue import job_queue
+from app.services.response_cache import response_cache
+from app.services.todo_stats_service import todo_stats
+from app.tenancy import TenantQuotaExceeded, current_tenant
 from flask import current_app
+from sqlalchemy import bindparam, func, lambda_stmt, select, update
+
+# Built once at import, the compiled form is reused from the engine's statement cache on every call
+SOFT_DELETE_TODO = (update(Todo)
+                    .where(Todo.tenant_id == bindparam('b_tenant_id'), Todo.id == bindparam('b_todo_id'))
+                    .values(deleted_at=func.now()))
+
+@job_queue.task('todo.written')
+def process_todo_write(todo_id, action):
+    """
+    Post-commit side effects of a Todo write, executed off the request path by the job queue.
+
+    Args:
+        todo_id (int): The ID of the Todo item that was written.
+        action (str): One of 'created', 'updated' or 'deleted'.
+    """
+    current_app.logger.info(f"TodoService: Processed post-commit work for {action} todo ID {todo_id}.")
 
 class TodoService:
     """
     Service class for handling business logic related to Todo items.
-    This class encapsulates all database interactions for Todo objects.
+    This class encapsulates all database interactions for Todo objects, every query is scoped to the current tenant (see app.tenancy).
+
+    The hot reads are lambda statements: SQLAlchemy builds and caches each one once per code location and only extracts the bound values
+    on later calls, instead of rebuilding a Query and computing its cache key on every request.
     """
     
     @staticmethod
-    def get_all_todos():
+    def get_all_todos(include_archived=False):
+        """
+        Retrieves all live (not soft deleted) Todo items from the database.
+
+        Args:
+            include_archived (bool): Whether to also return non-deleted items from the todos_archive table.
+
+        Returns:
+            list: A list of Todo objects, followed by TodoArchive objects ordered by ID when include_archived is set.
+        """
+        tenant_id = current_tenant()
+        current_app.logger.debug(f"TodoService: Retrieving all todos of tenant {tenant_id} from DB.")
+        todos = db.session.scalars(lambda_stmt(lambda: select(Todo).where(Todo.tenant_id == tenant_id, Todo.deleted_at.is_(None)))).all()
+        if include_archived:
+            stmt = lambda_stmt(lambda: select(TodoArchive).where(TodoArchive.tenant_id == tenant_id, TodoArchive.deleted_at.is_(None)))
+            archived = db.session.scalars(stmt).all()
+            todos = sorted(todos + archived, key=lambda todo: todo.id)
+        return todos
+    
+    @staticmethod
+    def get_todos_page(after_id, limit):
         """
-        Retrieves all Todo items from the database.
+        Retrieves one page of live Todo items using keyset pagination on the ID.
+
+        Args:
+            after_id (int): Only items with an ID greater than this are returned (0 for the first page).
+            limit (int): The maximum number of items in the page.
 
         Returns:
-            list: A list of all Todo objects.
+            list: Up to limit Todo objects ordered by ID.
         """
-        current_app.logger.debug("TodoService: Retrieving all todos from DB.")
-        return Todo.query.all()
+        tenant_id = current_tenant()
+        current_app.logger.debug(f"TodoService: Retrieving {limit} todos after ID {after_id} from DB.")
+        stmt = lambda_stmt(lambda: select(Todo)
+                           .where(Todo.tenant_id == tenant_id, Todo.deleted_at.is_(None), Todo.id > after_id)
+                           .order_by(Todo.id)
+                           .limit(limit))
+        return db.session.scalars(stmt).all()
     
     @staticmethod
-    def get_todo_by_id(todo_id):
+    def get_todo_by_id(todo_id, include_archived=False):
         """
-        Retrieves a specific Todo item by its ID.
+        Retrieves a specific live (not soft deleted) Todo item by its ID.
 
         Args:
             todo_id (int): The ID of the Todo item to retrieve.
+            include_archived (bool): Whether to fall back to the todos_archive table when the item is not in the hot table.
 
         Returns:
-            Todo: The Todo object if found, otherwise None.
+            Todo: The Todo (or TodoArchive) object if found and owned by the current tenant, otherwise None.
         """
+        tenant_id = current_tenant()
         current_app.logger.debug(f"TodoService: Retrieving todo with ID {todo_id} from DB.")
-        return Todo.query.get(todo_id)
+        stmt = lambda_stmt(lambda: select(Todo).where(Todo.tenant_id == tenant_id, Todo.id == todo_id, Todo.deleted_at.is_(None)))
+        todo = db.session.scalars(stmt).first()
+        if todo is None and include_archived:
+            stmt = lambda_stmt(lambda: select(TodoArchive)
+                               .where(TodoArchive.tenant_id == tenant_id, TodoArchive.id == todo_id, TodoArchive.deleted_at.is_(None))
+                               .limit(1))
+            todo = db.session.scalars(stmt).first()
+        return todo
+    
+    @staticmethod
+    def count_live_todos(tenant_id):
+        """
+        Counts the live (not soft deleted) Todo items of a tenant, served from the partial (tenant_id, id) index.
+
+        Args:
+            tenant_id (str): The tenant to count for.
+
+        Returns:
+            int: The number of live Todo items.
+        """
+        stmt = lambda_stmt(lambda: select(func.count()).select_from(Todo).where(Todo.tenant_id == tenant_id, Todo.deleted_at.is_(None)))
+        return db.session.scalar(stmt)
     
     @staticmethod
     def create_todo(new_todo_obj):
@@ -46,11 +122,24 @@ class TodoService:
 
         Returns:
             Todo: The newly created Todo object, now persisted with an ID.
+
+        Raises:
+            TenantQuotaExceeded: If the tenant already holds TENANT_MAX_TODOS live todos.
         """
         current_app.logger.debug(f"TodoService: Creating new todo: {new_todo_obj.title[:20]}...") # log snippet of title
+        if new_todo_obj.tenant_id is None:
+            new_todo_obj.tenant_id = current_tenant()
+        max_todos = current_app.config['TENANT_MAX_TODOS']
+        if max_todos and TodoService.count_live_todos(new_todo_obj.tenant_id) >= max_todos: # a soft limit, concurrent creates may overshoot it
+            raise TenantQuotaExceeded(f"Tenant {new_todo_obj.tenant_id} reached its quota of {max_todos} todos")
         db.session.add(new_todo_obj) 
+        db.session.flush() # assigns the ID needed by the change log and the post-commit job
+        db.session.add(TodoChange(tenant_id=new_todo_obj.tenant_id, todo_id=new_todo_obj.id, op='upsert'))
+        job_queue.enqueue('todo.written', todo_id=new_todo_obj.id, action='created')
+        todo_stats.record_created(new_todo_obj)
+        response_cache.bump_version(new_todo_obj.tenant_id)
         db.session.commit() 
-        current_app.logger.info(f"TodoService: Successfully created todo with ID {new_todo_obj.id}.")
+        current_app.logger.debug(f"TodoService: Successfully created todo with ID {new_todo_obj.id}.")
         return new_todo_obj
     
     @staticmethod
@@ -59,38 +148,49 @@ class TodoService:
         Updates an existing Todo item in the database.
 
         This method selectively updates fields of a Todo item based on the
-        provided JSON data and a validated partial Todo object.
+        provided JSON data and the validated values.
 
         Args:
             todo_orm_instance (Todo): The ORM instance of the Todo item to be updated.
             request_json_data (dict): The raw JSON data received in the request.
                                       Used to check which fields were actually sent for update.
-            validated_partial_obj (Todo): A Todo object (potentially partially populated)
-                                          containing validated data for the fields to be updated.
+            validated_partial_obj (dict or Todo): The validated values for the fields to be updated, either the plain
+                                                  dict from todo_payload_validator or a (partially populated) Todo object.
 
         Returns:
             Todo: The updated Todo ORM instance.
         """
         current_app.logger.debug(f"TodoService: Updating todo with ID {todo_orm_instance.id}.")
+        if isinstance(validated_partial_obj, dict):
+            validated = validated_partial_obj.get
+        else:
+            validated = lambda name: getattr(validated_partial_obj, name)
+        was_completed = todo_orm_instance.completed # captured for the stats counts
         updated_fields = []
         if 'title' in request_json_data:
-            todo_orm_instance.title = validated_partial_obj.title
+            todo_orm_instance.title = validated('title')
             updated_fields.append('title')
         if 'description' in request_json_data:
-            todo_orm_instance.description = validated_partial_obj.description
+            todo_orm_instance.description = validated('description')
             updated_fields.append('description')
         if 'completed' in request_json_data:
-            todo_orm_instance.completed = validated_partial_obj.completed
+            todo_orm_instance.completed = validated('completed')
             updated_fields.append('completed')
             
+        db.session.add(TodoChange(tenant_id=todo_orm_instance.tenant_id, todo_id=todo_orm_instance.id, op='upsert'))
+        job_queue.enqueue('todo.written', todo_id=todo_orm_instance.id, action='updated')
+        todo_stats.record_updated(todo_orm_instance, was_completed)
+        response_cache.bump_version(todo_orm_instance.tenant_id)
         db.session.commit()
-        current_app.logger.info(f"TodoService: Successfully updated fields {updated_fields} for todo ID {todo_orm_instance.id}.")
+        current_app.logger.debug(f"TodoService: Successfully updated fields {updated_fields} for todo ID {todo_orm_instance.id}.")
         return todo_orm_instance
     
     @staticmethod
     def delete_todo(todo):
         """
-        Deletes a Todo item from the database.
+        Soft deletes a Todo item by setting its deleted_at timestamp.
+
+        The row stays in the todos table, hidden from every read, until the archival job moves it to todos_archive.
 
         Args:
             todo (Todo): The Todo ORM instance to be deleted.
@@ -100,7 +200,13 @@ class TodoService:
         """
         todo_id = todo.id # capture id before deletion
         current_app.logger.debug(f"TodoService: Deleting todo with ID {todo_id}.")
-        db.session.delete(todo)
+        tenant_id = todo.tenant_id
+        db.session.execute(SOFT_DELETE_TODO, {'b_tenant_id': tenant_id, 'b_todo_id': todo_id}, execution_options={'synchronize_session': False})
+        db.session.expire(todo, ['deleted_at', 'updated_at']) # reloaded on next access, the values were set by the database
+        db.session.add(TodoChange(tenant_id=tenant_id, todo_id=todo_id, op='delete')) # tombstone for delta-sync clients
+        job_queue.enqueue('todo.written', todo_id=todo_id, action='deleted')
+        todo_stats.record_deleted(todo)
+        response_cache.bump_version(tenant_id)
         db.session.commit()
-        current_app.logger.info(f"TodoService: Successfully deleted todo with ID {todo_id}.")
+        current_app.logger.debug(f"TodoService: Successfully deleted todo with ID {todo_id}.")
         return True  # confirms successful deletion.
\ No newline at end of file
@@ -0,0 +1,158 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models import Todo, TodoChange, TodoSyncWatermark
+from app.tenancy import current_tenant
+from flask import current_app
+from sqlalchemy import and_, delete, func, select, tuple_
+
+START = (0, 0) # the position before every change, used for a full sync
+
+class SyncTokenError(ValueError):
+    """Raised for sync tokens that are malformed."""
+
+
+class SyncTokenExpired(Exception):
+    """Raised for sync tokens from before a tombstone removed by compaction; the client must perform a full resync."""
+
+
+class TodoSyncService:
+    """
+    Service class for incremental (delta) synchronisation of Todo items.
+
+    Every TodoService write appends a row to the todo_changes log in the same transaction. Clients keep an opaque sync token holding the last
+    seen log position and receive only the todos changed since then, coalesced to one entry per todo: the current state for created/updated
+    items and a tombstone for deleted or archived ones.
+
+    A position is (xid, seq), the writing transaction's ID and the log sequence number. On PostgreSQL a transaction can commit after another
+    one that got a higher seq, so only changes of transactions older than every running one (the snapshot's xmin) are served: no change can
+    become visible later below a position already handed out. On SQLite writes are serialized, xid is always 0 and seq alone orders the log.
+    """
+
+    @staticmethod
+    def encode_token(position):
+        """
+        Builds an opaque sync token for a change-log position.
+
+        Args:
+            position (tuple): The last change-log (xid, seq) position the client has seen.
+
+        Returns:
+            str: A URL-safe token.
+        """
+        raw = "{}.{}".format(*position).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_token(token):
+        """
+        Parses a sync token.
+
+        Args:
+            token (str): A token previously returned by the changes endpoint.
+
+        Returns:
+            tuple: The change-log (xid, seq) position stored in the token.
+
+        Raises:
+            SyncTokenError: If the token is malformed.
+        """
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            xid, seq = (int(part) for part in base64.urlsafe_b64decode(padded.encode()).decode().split('.'))
+        except (ValueError, UnicodeDecodeError) as err:
+            raise SyncTokenError(f"Invalid sync token: {token}") from err
+        if xid < 0 or seq < 0:
+            raise SyncTokenError(f"Invalid sync token: {token}")
+        return xid, seq
+
+    @staticmethod
+    def get_changes(since, limit):
+        """
+        Returns the current tenant's todos changed after a change-log position, one entry per todo.
+
+        Positions are global, so a tenant's positions have gaps where other tenants wrote; tokens stay valid regardless.
+
+        Args:
+            since (tuple): The change-log (xid, seq) position the client has already seen, START for a full sync.
+            limit (int): The maximum number of todos to return.
+
+        Returns:
+            tuple: (changes, next_position, has_more) where changes is a list of (todo_id, op, Todo or None) ordered by their latest change.
+
+        Raises:
+            SyncTokenExpired: If compaction removed a tombstone of the tenant after the given position.
+        """
+        tenant_id = current_tenant()
+        current_app.logger.debug(f"TodoSyncService: Retrieving changes of tenant {tenant_id} after position {since}.")
+        in_range = [TodoChange.tenant_id == tenant_id, tuple_(TodoChange.xid, TodoChange.seq) > tuple_(*since)] # the (tenant_id, xid, seq) index
+        if db.engine.dialect.name == 'postgresql':
+            in_range.append(TodoChange.xid < func.txid_snapshot_xmin(func.txid_current_snapshot())) # hold back changes of running transactions
+        latest = (select(TodoChange.todo_id, func.max(TodoChange.seq).label('seq'))
+                  .where(*in_range)
+                  .group_by(TodoChange.todo_id)
+                  .subquery())
+        rows = db.session.execute(
+            select(TodoChange.xid, latest.c.seq, latest.c.todo_id, TodoChange.op, Todo)
+            .join(TodoChange, TodoChange.seq == latest.c.seq)
+            .outerjoin(Todo, Todo.id == latest.c.todo_id)
+            .order_by(TodoChange.xid, latest.c.seq)
+            .limit(limit + 1) # one extra row tells whether another page follows
+        ).all()
+
+        # Checked after reading, a compaction committed before the read above is always seen here
+        if since != START:
+            watermark = db.session.execute(
+                select(TodoSyncWatermark.xid, TodoSyncWatermark.seq).where(TodoSyncWatermark.tenant_id == tenant_id)
+            ).first()
+            if watermark is not None and since < tuple(watermark):
+                raise SyncTokenExpired("Changes after this sync token were compacted, perform a full resync")
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        changes = []
+        for xid, seq, todo_id, op, todo in rows:
+            if op == 'upsert' and todo is not None and todo.deleted_at is None:
+                changes.append((todo_id, 'upsert', todo))
+            else:
+                changes.append((todo_id, 'delete', None)) # soft deleted, archived or missing rows become tombstones
+        next_position = (rows[-1][0], rows[-1][1]) if rows else since
+        return changes, next_position, has_more
+
+    @staticmethod
+    def compact_changes(retention_days):
+        """
+        Compacts the change log so it does not grow without bound.
+
+        Superseded rows (any change that has a newer change for the same todo) are removed first, which never affects a sync result. Tombstones
+        older than the retention window are then dropped, and the last dropped position of each tenant is kept as its watermark: get_changes
+        rejects tokens before it, whatever their age.
+
+        Args:
+            retention_days (int): How long tombstones are kept.
+
+        Returns:
+            int: The number of removed change-log rows.
+        """
+        latest = select(func.max(TodoChange.seq)).group_by(TodoChange.todo_id)
+        superseded = db.session.execute(delete(TodoChange).where(TodoChange.seq.not_in(latest))).rowcount
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        old_tombstones = and_(TodoChange.op == 'delete', TodoChange.changed_at < cutoff)
+        expired = 0
+        last_xids = select(TodoChange.tenant_id, func.max(TodoChange.xid)).where(old_tombstones).group_by(TodoChange.tenant_id)
+        for tenant_id, xid in db.session.execute(last_xids).all():
+            seq = db.session.scalar(select(func.max(TodoChange.seq)).where(old_tombstones, TodoChange.tenant_id == tenant_id, TodoChange.xid == xid))
+            watermark = db.session.get(TodoSyncWatermark, tenant_id)
+            if watermark is None:
+                db.session.add(TodoSyncWatermark(tenant_id=tenant_id, xid=xid, seq=seq))
+            elif (xid, seq) > (watermark.xid, watermark.seq):
+                watermark.xid, watermark.seq = xid, seq
+            # Bounded by the watermark, a tombstone committed since the query above stays for the next run
+            expired += db.session.execute(delete(TodoChange).where(
+                old_tombstones, TodoChange.tenant_id == tenant_id, tuple_(TodoChange.xid, TodoChange.seq) <= tuple_(xid, seq)
+            )).rowcount
+        db.session.commit()
+
+        current_app.logger.info(f"TodoSyncService: Compacted {superseded} superseded changes and {expired} expired tombstones.")
+        return superseded + expired
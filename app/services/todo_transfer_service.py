@@ -0,0 +1,310 @@
+import csv
+import io
+from app import db
+from app.models import Todo, TodoChange
+from app.schemas import todo_payload_validator
+from app.services.response_cache import response_cache
+from app.services.todo_stats_service import todo_stats
+from app.services.todo_db_service import TodoService
+from app.tenancy import TenantQuotaExceeded, current_tenant
+from flask import current_app
+from sqlalchemy import func, insert, literal, select
+
+# Optional columnar format, only offered when pyarrow is installed
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_COLUMNS = ('id', 'title', 'description', 'completed', 'created_at', 'updated_at')
+IMPORT_FIELDS = ('title', 'description', 'completed') # imported rows always become new todos, IDs and timestamps are assigned on insert
+MIMETYPES = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+# Same layout as the CSV written for other backends: true/false and ISO 8601 timestamps
+COPY_OUT_QUERY = ("COPY (SELECT id, title, description, completed::text, to_json(created_at) #>> '{}', to_json(updated_at) #>> '{}' "
+                  "FROM todos WHERE tenant_id = %s AND deleted_at IS NULL ORDER BY id) TO STDOUT WITH (FORMAT csv, HEADER true)")
+
+class TransferFormatError(ValueError):
+    """Raised for unknown transfer formats, or for parquet when pyarrow is not installed."""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting what pyarrow writes, drained after every row group of a streamed export."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position # the Parquet writer records row group offsets
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def available_formats():
+    """The transfer formats supported by this installation."""
+    return ('csv', 'parquet') if pyarrow is not None else ('csv',)
+
+class TodoTransferService:
+    """
+    Service class for bulk import and export of the current tenant's todos in CSV or Parquet.
+
+    Data moves in batches of rows: on PostgreSQL CSV goes through COPY FROM/TO STDIN, other backends use batched executemany inserts and
+    streamed selects. Imported rows are validated a batch at a time through todo_payload_validator; invalid rows are skipped and reported.
+    """
+
+    @staticmethod
+    def _check_format(fmt):
+        if fmt not in MIMETYPES:
+            raise TransferFormatError(f"Unsupported format '{fmt}', expected one of {', '.join(MIMETYPES)}")
+        if fmt not in available_formats():
+            raise TransferFormatError(f"Format '{fmt}' requires the pyarrow package")
+
+    @staticmethod
+    def _copy_cursor():
+        """A DB-API cursor supporting COPY on the session's connection, or None when the backend or driver has no COPY support."""
+        if db.engine.dialect.name != 'postgresql':
+            return None
+        cursor = db.session.connection().connection.driver_connection.cursor()
+        return cursor if hasattr(cursor, 'copy_expert') or hasattr(cursor, 'copy') else None # psycopg2 or psycopg 3
+
+    # --- Export ---
+
+    @staticmethod
+    def export_todos(output, fmt='csv', batch_size=5000, progress=None):
+        """
+        Writes every live Todo item of the current tenant to a binary file object.
+
+        Args:
+            output: A writable binary file object.
+            fmt (str): 'csv' (with a header row) or 'parquet'.
+            batch_size (int): Rows fetched and written per batch (a Parquet row group).
+            progress (callable): Called with the number of rows written so far after each batch.
+
+        Returns:
+            int: The number of exported todos.
+        """
+        TodoTransferService._check_format(fmt)
+        tenant_id = current_tenant()
+        current_app.logger.info(f"TodoTransferService: Exporting todos of tenant {tenant_id} as {fmt}.")
+        cursor = TodoTransferService._copy_cursor() if fmt == 'csv' else None
+        if cursor is not None and hasattr(cursor, 'copy_expert'):
+            cursor.copy_expert(cursor.mogrify(COPY_OUT_QUERY, (tenant_id,)), output) # psycopg2 writes the rows into output as they arrive
+            exported = cursor.rowcount
+            if progress:
+                progress(exported)
+        else:
+            chunks = TodoTransferService._export_chunks(tenant_id, fmt, batch_size, progress)
+            while True:
+                try:
+                    output.write(next(chunks))
+                except StopIteration as done:
+                    exported = done.value
+                    break
+        current_app.logger.info(f"TodoTransferService: Exported {exported} todos.")
+        return exported
+
+    @staticmethod
+    def iter_export(fmt='csv', batch_size=5000, progress=None):
+        """
+        Exports every live Todo item of the current tenant as chunks of bytes, produced one batch at a time for streaming responses.
+
+        The format is checked and the tenant resolved right away, the rows are only read while the chunks are consumed. With psycopg2, whose
+        COPY cannot be consumed incrementally, CSV is produced from batched selects instead.
+
+        Args:
+            fmt (str): 'csv' (with a header row) or 'parquet'.
+            batch_size (int): Rows fetched per batch (a Parquet row group).
+            progress (callable): Called with the number of rows produced so far after each batch.
+
+        Returns:
+            generator: The export as chunks of bytes.
+        """
+        TodoTransferService._check_format(fmt)
+        tenant_id = current_tenant()
+        current_app.logger.info(f"TodoTransferService: Streaming todos of tenant {tenant_id} as {fmt}.")
+        return TodoTransferService._export_chunks(tenant_id, fmt, batch_size, progress)
+
+    @staticmethod
+    def _export_chunks(tenant_id, fmt, batch_size, progress):
+        """Yield the export as chunks of bytes, returning the number of exported todos."""
+        cursor = TodoTransferService._copy_cursor() if fmt == 'csv' else None
+        if cursor is not None and hasattr(cursor, 'copy'): # psycopg 3 hands out COPY TO STDOUT data as it arrives
+            with cursor.copy(COPY_OUT_QUERY, (tenant_id,)) as copy:
+                for chunk in copy:
+                    yield bytes(chunk)
+            if progress:
+                progress(cursor.rowcount)
+            return cursor.rowcount
+
+        stmt = (select(*(getattr(Todo, name) for name in EXPORT_COLUMNS))
+                .where(Todo.tenant_id == tenant_id, Todo.deleted_at.is_(None))
+                .order_by(Todo.id)
+                .execution_options(yield_per=batch_size)) # server-side cursor where supported, never the whole table in memory
+        batches = (list(zip(*rows)) for rows in db.session.execute(stmt).partitions()) # one list per column
+        if fmt == 'parquet':
+            return (yield from TodoTransferService._parquet_chunks(batches, progress))
+        return (yield from TodoTransferService._csv_chunks(batches, progress))
+
+    @staticmethod
+    def _csv_chunks(batches, progress):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        exported = 0
+        for columns in batches:
+            todo_id, title, description, completed, created_at, updated_at = columns
+            writer.writerows(zip(
+                todo_id, title, description,
+                ('true' if value else 'false' for value in completed),
+                (value.isoformat() if value else None for value in created_at),
+                (value.isoformat() if value else None for value in updated_at)
+            ))
+            exported += len(todo_id)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            if progress:
+                progress(exported)
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8') # the header of an empty export
+        return exported
+
+    @staticmethod
+    def _parquet_chunks(batches, progress):
+        schema = pyarrow.schema([
+            ('id', pyarrow.int64()),
+            ('title', pyarrow.string()),
+            ('description', pyarrow.string()),
+            ('completed', pyarrow.bool_()),
+            ('created_at', pyarrow.timestamp('us', tz='UTC')),
+            ('updated_at', pyarrow.timestamp('us', tz='UTC'))
+        ])
+        sink = _ChunkSink()
+        exported = 0
+        with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+            for columns in batches:
+                writer.write_table(pyarrow.Table.from_arrays([pyarrow.array(column, type=field.type)
+                                                              for column, field in zip(columns, schema)], schema=schema))
+                exported += len(columns[0])
+                yield sink.drain() # one row group
+                if progress:
+                    progress(exported)
+        yield sink.drain() # the footer written on close
+        return exported
+
+    # --- Import ---
+
+    @staticmethod
+    def _read_batches(source, fmt, batch_size):
+        """Yield lists of raw payload dicts holding only IMPORT_FIELDS."""
+        if fmt == 'parquet':
+            parquet_file = pyarrow.parquet.ParquetFile(source)
+            columns = [name for name in IMPORT_FIELDS if name in parquet_file.schema_arrow.names]
+            for record_batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+                yield [{name: value for name, value in row.items() if value is not None or name == 'description'}
+                       for row in record_batch.to_pylist()]
+            return
+
+        text = io.TextIOWrapper(source, encoding='utf-8', newline='')
+        try:
+            batch = []
+            for row in csv.DictReader(text):
+                payload = {name: row[name] for name in IMPORT_FIELDS if row.get(name) not in (None, '')}
+                if 'description' in row and not row['description']:
+                    payload['description'] = None # CSV has no NULL, an empty description means none
+                batch.append(payload)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            text.detach() # leave source open for the caller
+
+    @staticmethod
+    def import_todos(source, fmt='csv', batch_size=1000, progress=None, max_errors=100):
+        """
+        Creates Todo items for the current tenant from a binary file object, committing one batch at a time.
+
+        Only the title, description and completed columns are read, any other column (such as those of an export) is ignored. Rows failing
+        validation are skipped. Batches committed before an error (e.g. the tenant quota) stay imported.
+
+        Args:
+            source: A readable binary file object, seekable for parquet.
+            fmt (str): 'csv' (with a header row) or 'parquet'.
+            batch_size (int): Rows validated and inserted per transaction.
+            progress (callable): Called with (rows read, rows imported) after each batch.
+            max_errors (int): The maximum number of rejected rows whose messages are reported.
+
+        Returns:
+            dict: 'imported' and 'rejected' row counts, and 'errors' mapping 1-based row numbers to validation messages.
+
+        Raises:
+            TenantQuotaExceeded: If a batch would take the tenant over TENANT_MAX_TODOS live todos.
+        """
+        TodoTransferService._check_format(fmt)
+        tenant_id = current_tenant()
+        max_todos = current_app.config['TENANT_MAX_TODOS']
+        current_app.logger.info(f"TodoTransferService: Importing {fmt} todos for tenant {tenant_id}.")
+        report = {'imported': 0, 'rejected': 0, 'errors': {}}
+        read = 0
+        for batch in TodoTransferService._read_batches(source, fmt, batch_size):
+            valid, errors = todo_payload_validator.validate_many(batch)
+            for index, messages in errors.items():
+                if len(report['errors']) < max_errors:
+                    report['errors'][read + index + 1] = messages
+            read += len(batch)
+            report['rejected'] += len(errors)
+            if valid:
+                if max_todos and TodoService.count_live_todos(tenant_id) + len(valid) > max_todos:
+                    raise TenantQuotaExceeded(f"Importing {len(valid)} more todos would exceed the quota of {max_todos} for tenant {tenant_id}")
+                TodoTransferService._insert_batch(valid, tenant_id)
+                report['imported'] += len(valid)
+            if progress:
+                progress(read, report['imported'])
+        current_app.logger.info(f"TodoTransferService: Imported {report['imported']} todos, rejected {report['rejected']} rows.")
+        return report
+
+    @staticmethod
+    def _insert_batch(rows, tenant_id):
+        for row in rows:
+            row.setdefault('description', None)
+            row['tenant_id'] = tenant_id
+        cursor = TodoTransferService._copy_cursor()
+        if cursor is None:
+            todo_ids = db.session.scalars(insert(Todo).returning(Todo.id), rows).all() # batched executemany
+            db.session.execute(insert(TodoChange), [{'tenant_id': tenant_id, 'todo_id': todo_id, 'op': 'upsert'} for todo_id in todo_ids])
+        else:
+            watermark = db.session.scalar(select(func.coalesce(func.max(Todo.id), 0)))
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                (row['tenant_id'], row['title'], row['description'], 'true' if row['completed'] else 'false') for row in rows
+            )
+            query = "COPY todos (tenant_id, title, description, completed) FROM STDIN WITH (FORMAT csv)"
+            if hasattr(cursor, 'copy_expert'):
+                buffer.seek(0)
+                cursor.copy_expert(query, buffer)
+            else:
+                with cursor.copy(query) as copy:
+                    copy.write(buffer.getvalue())
+            # Sequence values only grow, so every copied row is above the watermark; concurrent creates above it just get a redundant upsert
+            db.session.execute(insert(TodoChange).from_select(
+                ['tenant_id', 'todo_id', 'op'],
+                select(Todo.tenant_id, Todo.id, literal('upsert')).where(Todo.tenant_id == tenant_id, Todo.id > watermark)
+            ))
+        todo_stats.record_inserted(tenant_id, rows)
+        response_cache.bump_version(tenant_id)
+        db.session.commit()
@@ -0,0 +1,144 @@
+import threading
+import time
+from app import db
+from app.deadlines import DeadlineExceeded, remaining_seconds
+from flask import current_app
+
+class CoalescedWriteError(Exception):
+    """
+    Raised in every request merged into a coalesced write that failed, chained from the error raised while applying it.
+    """
+
+
+class _PendingWrite:
+    """
+    Fields waiting to be written to one todo, shared by the leader request and every request that joined it.
+    """
+
+    def __init__(self, fields):
+        self.fields = dict(fields)
+        self.joined = 0
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _KeyWrites:
+    """
+    The write in progress for one key and the pending write collecting the updates that arrive meanwhile.
+    """
+
+    def __init__(self):
+        self.idle = threading.Event() # set when the write in progress finished and a pending write is waiting for it
+        self.next = None              # _PendingWrite, None while no update is waiting
+
+
+class WriteCoalescer:
+    """
+    Merges bursts of updates to the same todo into a single UPDATE.
+
+    An update for a todo without a write in progress is applied immediately. Updates arriving while it is being written open a pending
+    write: the first one becomes its leader and later ones merge their fields into it (last writer wins per field). The leader waits for the
+    write in progress and for WRITE_COALESCE_WINDOW_MS milliseconds from its arrival, then applies the merged fields in one transaction, and
+    every merged request returns the same final state. The others block for at most the time left in their own request deadline.
+    Coalescing happens per worker process; a window of 0 disables it.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('WRITE_COALESCE_WINDOW_MS', 0)
+        app.extensions['write_coalescer'] = {'lock': threading.Lock(), 'writes': {}} # key -> _KeyWrites
+
+    def submit(self, key, fields, apply):
+        """
+        Applies an update, merged with concurrent updates for the same key.
+
+        A request that has to wait first commits the session's transaction, which must hold no pending changes, so its pooled connection does
+        not sit idle in transaction; ORM instances loaded before are reloaded on their next access.
+
+        Args:
+            key: Identifies the row being written, typically the todo ID.
+            fields (dict): The validated fields of this request.
+            apply (callable): Called once with the fields to write, commits them and returns the serialized final state.
+
+        Returns:
+            The value returned by apply for the write that included the fields.
+
+        Raises:
+            DeadlineExceeded: If the request deadline passes while waiting for the leader of a merged write.
+            CoalescedWriteError: If the merged write this request joined failed in its leader.
+        """
+        window = current_app.config['WRITE_COALESCE_WINDOW_MS'] / 1000
+        if window <= 0:
+            return apply(fields)
+
+        state = current_app.extensions['write_coalescer']
+        with state['lock']:
+            writes = state['writes'].get(key)
+            if writes is None: # no contention, write right away
+                writes = state['writes'][key] = _KeyWrites()
+                pending = None
+            elif writes.next is None:
+                pending = writes.next = _PendingWrite(fields)
+                leader = True
+            else:
+                pending = writes.next
+                pending.fields.update(fields) # later requests win for the fields they send
+                pending.joined += 1
+                leader = False
+
+        if pending is None:
+            try:
+                return apply(fields)
+            finally:
+                self._finish(state, key, writes)
+
+        db.session.commit() # ends the read transaction of the caller before waiting
+        if leader:
+            return self._lead(state, key, writes, pending, time.monotonic() + window, apply)
+        return self._wait(pending)
+
+    @staticmethod
+    def _finish(state, key, writes):
+        with state['lock']:
+            if writes.next is None:
+                del state['writes'][key] # requests arriving from now on write right away
+            else:
+                writes.idle.set() # hands the key over to the leader of the pending write
+
+    @staticmethod
+    def _wait(pending):
+        remaining = remaining_seconds()
+        if not pending.done.wait(max(remaining, 0) if remaining is not None else None):
+            # The merged fields may still be written once the stalled leader commits
+            raise DeadlineExceeded("Request deadline reached while waiting for a coalesced write")
+        if pending.error is not None:
+            raise CoalescedWriteError(f"The coalesced write failed: {pending.error}") from pending.error # one exception per request
+        return pending.result
+
+    @classmethod
+    def _lead(cls, state, key, writes, pending, window_end, apply):
+        writes.idle.wait() # the write in progress is bounded by its own request deadline
+        time.sleep(max(window_end - time.monotonic(), 0)) # collect the updates that arrive during the window
+        with state['lock']:
+            writes.next = None # requests arriving from now on open the next pending write
+            writes.idle.clear()
+            merged = dict(pending.fields)
+            joined = pending.joined
+        try:
+            pending.result = apply(merged)
+            if joined:
+                current_app.logger.debug(f"WriteCoalescer: Merged {joined + 1} updates for {key} into one write.")
+            return pending.result
+        except Exception as err:
+            pending.error = err
+            raise
+        finally:
+            pending.done.set()
+            cls._finish(state, key, writes)
+
+
+write_coalescer = WriteCoalescer()
@@ -0,0 +1,121 @@
+import _thread
+import os
+import signal
+import threading
+import time
+from flask import jsonify, request, current_app
+from app import db
+
+IN_FLIGHT_KEY = 'todo.in_flight' # WSGI environ flag, set only for requests counted as in flight
+
+def init_app(app):
+    """Track in-flight requests and drain them on SIGTERM/SIGINT before the process exits.
+
+    When draining starts, /readyz flips to 503 so the load balancer stops routing here and new requests (other than the probes) are
+    answered 503 with Connection: close. Requests already running get up to SHUTDOWN_DRAIN_TIMEOUT seconds to finish. Then the log
+    handlers are flushed, the job queue is drained and the connection pool is disposed. Only after that does the signal take its
+    previous effect (exit, or the WSGI server's own graceful stop).
+    """
+    app.config.setdefault('SHUTDOWN_DRAIN_TIMEOUT', 25.0)
+    app.config.setdefault('SHUTDOWN_SIGNAL_HANDLERS', True)
+    app.config.setdefault('SHUTDOWN_RETRY_AFTER', 5)
+    app.extensions['shutdown'] = {
+        'idle': threading.Condition(), # guards the counters below and signals when in_flight drops to 0
+        'draining': False,             # new requests are refused
+        'drain_started': False,        # drain() is running or done
+        'in_flight': 0,
+        'drained': threading.Event()
+    }
+
+    app.before_request(_start_request)
+    app.teardown_request(_finish_request)
+    if app.config['SHUTDOWN_SIGNAL_HANDLERS']:
+        install_signal_handlers(app)
+
+def _start_request():
+    state = current_app.extensions['shutdown']
+    with state['idle']:
+        if state['draining'] and request.blueprint != 'health': # probes keep answering while draining
+            response = jsonify({'description': 'The server is shutting down, please retry.'})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(current_app.config['SHUTDOWN_RETRY_AFTER'])
+            response.headers['Connection'] = 'close'
+            return response
+        state['in_flight'] += 1
+        request.environ[IN_FLIGHT_KEY] = True
+
+def _finish_request(exc):
+    if not request.environ.pop(IN_FLIGHT_KEY, False):
+        return
+    state = current_app.extensions['shutdown']
+    with state['idle']:
+        state['in_flight'] -= 1
+        if state['in_flight'] == 0:
+            state['idle'].notify_all()
+
+def drain(app, timeout=None):
+    """
+    Stops taking new requests, waits for the in-flight ones, then flushes logs, drains the job queue and disposes the pool.
+
+    Safe to call more than once, later calls wait for the first drain to finish.
+
+    Args:
+        app (Flask): The application to drain.
+        timeout (float): Seconds allowed for in-flight requests and queued jobs, defaults to SHUTDOWN_DRAIN_TIMEOUT.
+
+    Returns:
+        bool: True if every in-flight request and queued job finished within the timeout.
+    """
+    state = app.extensions['shutdown']
+    if timeout is None:
+        timeout = app.config['SHUTDOWN_DRAIN_TIMEOUT']
+    deadline = time.monotonic() + timeout
+    with state['idle']:
+        first = not state['drain_started']
+        state['drain_started'] = state['draining'] = True
+        if first:
+            app.logger.info(f"Shutdown: Draining {state['in_flight']} in-flight requests.")
+        requests_done = state['idle'].wait_for(lambda: state['in_flight'] == 0, timeout)
+    if not first:
+        return state['drained'].wait(max(deadline - time.monotonic(), 0))
+    if not requests_done:
+        app.logger.warning(f"Shutdown: Drain timeout reached with {state['in_flight']} requests still running.")
+
+    from app.services.job_queue import job_queue
+    with app.app_context():
+        jobs_done = job_queue.shutdown(timeout=max(deadline - time.monotonic(), 0))
+        db.engine.dispose() # close pooled connections cleanly instead of letting the server see them drop
+    app.logger.info("Shutdown: Drain complete, connection pool disposed.")
+    for handler in app.logger.handlers:
+        handler.flush()
+    state['drained'].set()
+    return requests_done and jobs_done
+
+def install_signal_handlers(app, signals=(signal.SIGTERM, signal.SIGINT)):
+    """Drain the app on the given signals, then hand the signal to the previously installed handler."""
+    if threading.current_thread() is not threading.main_thread():
+        app.logger.warning("Shutdown: Signal handlers can only be installed from the main thread, skipping.")
+        return
+
+    previous = {}
+
+    def handle(signum, frame):
+        app.logger.info(f"Shutdown: Received {signal.Signals(signum).name}.")
+        app.extensions['shutdown']['draining'] = True # readiness fails immediately, even before the drain thread runs
+        signal.signal(signum, previous[signum] if previous[signum] is not None else signal.SIG_DFL) # a second signal skips the drain
+        # Drain off the main thread: with sync workers the main thread is the one serving the in-flight request
+        threading.Thread(target=_drain_and_resume, args=(signum,), name='shutdown-drain', daemon=True).start()
+
+    def _drain_and_resume(signum):
+        drain(app)
+        handler = previous[signum]
+        if handler is signal.default_int_handler:
+            _thread.interrupt_main() # KeyboardInterrupt in the main thread, as without this handler
+        elif callable(handler):
+            handler(signum, None) # e.g. the WSGI server's graceful stop
+        elif handler != signal.SIG_IGN:
+            os.kill(os.getpid(), signum) # default action, restored by handle()
+
+    for signum in signals:
+        previous[signum] = signal.getsignal(signum)
+        signal.signal(signum, handle)
@@ -0,0 +1,78 @@
+import threading
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app import db
+
+WRITER_LOCK_KEY = 'sqlite_writer_lock'
+
+def init_app(app):
+    """Tune SQLite connections and serialize writers, must run after db.init_app. Does nothing for other backends.
+
+    Every new connection gets the journal mode (WAL by default), synchronous level, busy timeout, mmap and page cache sizes configured as
+    SQLITE_* settings. SQLite allows a single writer at a time, so a per-process writer lock is taken by a session when it first writes
+    (flush or INSERT/UPDATE/DELETE statement) and released when its transaction ends. Worker threads then queue on the lock instead of
+    spinning on SQLITE_BUSY, while readers keep running concurrently against the WAL snapshot.
+    """
+    app.config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    app.config.setdefault('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+    app.config.setdefault('SQLITE_CACHE_SIZE', -64000)
+
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri or make_url(uri).get_backend_name() != 'sqlite':
+        return
+
+    app.extensions['sqlite_writer'] = {'lock': threading.RLock()} # reentrant: eager jobs write from inside the committing thread
+    with app.app_context():
+        event.listen(db.engine, 'connect', _pragma_listener(app.config))
+    app.logger.info(f"SQLite tuning enabled with journal_mode={app.config['SQLITE_JOURNAL_MODE']}.")
+
+def _pragma_listener(config):
+    pragmas = (
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']), # in-memory databases keep journal_mode=memory
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),   # NORMAL is durable across application crashes in WAL mode
+        ('busy_timeout', int(config['SQLITE_BUSY_TIMEOUT_MS'])),
+        ('mmap_size', int(config['SQLITE_MMAP_SIZE'])),
+        ('cache_size', int(config['SQLITE_CACHE_SIZE'])), # negative values are KiB
+        ('temp_store', 'MEMORY')
+    )
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return apply_pragmas
+
+def _acquire_writer_lock(session):
+    if WRITER_LOCK_KEY in session.info or not has_app_context():
+        return
+    state = current_app.extensions.get('sqlite_writer')
+    if state is None:
+        return
+    if not state['lock'].acquire(timeout=current_app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000):
+        raise PoolTimeoutError("Timed out waiting for the SQLite writer lock") # answered with 503 by the deadline handlers
+    session.info[WRITER_LOCK_KEY] = state['lock']
+
+@event.listens_for(Session, 'before_flush')
+def _lock_before_flush(session, flush_context, instances):
+    _acquire_writer_lock(session)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _lock_before_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _acquire_writer_lock(orm_execute_state.session)
+
+@event.listens_for(Session, 'after_transaction_end')
+def _release_writer_lock(session, transaction):
+    if transaction.parent is not None: # only the outermost transaction ends the write
+        return
+    lock = session.info.pop(WRITER_LOCK_KEY, None)
+    if lock is not None:
+        lock.release()
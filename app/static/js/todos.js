@@ -1,3 +1,29 @@
+// Delay in milliseconds before a toggle is sent, repeated clicks on the same TODO within it are collapsed into one request.
+const TOGGLE_DEBOUNCE_MS = 300;
+// Toggles waiting to be sent: todo id -> { timer, original, desired }
+const pendingToggles = new Map();
+
+// Number of TODO items requested per page (keyset pagination on the id, see GET /api/todos?limit=&after_id=).
+const PAGE_SIZE = 200;
+// Extra rows rendered above and below the visible part of the list so that short scrolls never show blank space.
+const OVERSCAN = 10;
+
+// Client-side view of the TODO list. Only the rows inside the visible window exist in the DOM, the rest is represented by two spacer elements.
+const state = {
+    todos: [],             // loaded TODO items in ascending id order (the server's page order)
+    positions: new Map(),  // todo id -> index in state.todos
+    nodes: new Map(),      // todo id -> rendered <li>, only for rows currently inside the window
+    lastId: 0,             // keyset cursor: id of the last loaded TODO
+    hasMore: true,         // whether the server may have more pages
+    loading: false,        // a page request is in flight
+    renderQueued: false,   // a window render is scheduled for the next animation frame
+    rowHeight: 120         // estimated row height in pixels, refined from the rendered rows
+};
+
+// Spacers stand in for the rows above and below the rendered window so the scrollbar reflects the full list.
+const topSpacer = createSpacer();
+const bottomSpacer = createSpacer();
+
 document.addEventListener('DOMContentLoaded', function() {
     // Immediately fetches and displays existing TODO items when the page loads.
     fetchTodos();
@@ -8,50 +34,204 @@ document.addEventListener('DOMContentLoaded', function() {
         event.preventDefault(); // prevents the default page reload on form submission
         createTodo();
     });
+
+    // Re-render the visible window (and fetch further pages when needed) as the user scrolls or resizes the page.
+    window.addEventListener('scroll', scheduleRender, { passive: true });
+    window.addEventListener('resize', scheduleRender);
 });
 
-// Fetches all TODO items from the server API and updates the list displayed on the page.
+// Creates an empty list element used as a spacer above or below the rendered window.
+function createSpacer() {
+    const spacer = document.createElement('li');
+    spacer.className = 'todo-spacer';
+    spacer.setAttribute('aria-hidden', 'true');
+    return spacer;
+}
+
+// Resets the client state and loads the first page of TODO items.
 function fetchTodos() {
+    state.nodes.forEach(node => node.remove());
+    state.nodes.clear();
+    state.todos = [];
+    state.positions.clear();
+    state.lastId = 0;
+    state.hasMore = true;
+    fetchNextPage();
+}
+
+// Fetches the next page of TODO items from the server API and appends it to the client state.
+function fetchNextPage() {
+    if (state.loading || !state.hasMore) {
+        return; // a page is already on its way, or everything has been loaded
+    }
+    state.loading = true;
     const todoList = document.getElementById('todo-list'); // the HTML element where TODOs will be displayed
     const loading = document.getElementById('loading'); // will display "loading..." while the items are being fetched
 
-    // Makes an asynchronous HTTP GET request to the '/api/todos' endpoint.
-    fetch('/api/todos')
+    // Makes an asynchronous HTTP GET request for one page, starting after the last loaded id.
+    fetch(`/api/todos?limit=${PAGE_SIZE}&after_id=${state.lastId}`)
         .then(response => {
             // Checks if the server's response was successful (such HTTP status 200-299).
             if (!response.ok) {
                 // If the response is not ok, an error is thrown to be caught by the .catch block.
                 throw new Error('Network response was not ok');
             }
-            // Parses the response body from JSON format into a JavaScript array or object.
+            // Parses the response body from JSON format into a JavaScript array.
             return response.json();
         })
         .then(todos => {
             // This block executes if the fetch and JSON parsing were successful.
             loading.style.display = 'none'; // hides the loading indicator once todo items are parsed
-            todoList.innerHTML = ''; // clears any existing content from the TODO list.
-
-            // If there are no TODOs, it displays a message indicating that.
-            if (todos.length === 0) {
-                todoList.innerHTML = '<p>No TODOs found. Create your first one above!</p>'
-                return;
-            }
-
-            // Iterates over each TODO item received from the server.
+            state.loading = false;
+            state.hasMore = todos.length === PAGE_SIZE; // a short page means the end of the list was reached
             todos.forEach(todo => {
-                // For each TODO, creates a corresponding HTML element.
-                const todoItem = createTodoElement(todo);
-                todoList.appendChild(todoItem);
+                if (!state.positions.has(todo.id)) { // a TODO created locally may already be present
+                    state.positions.set(todo.id, state.todos.length);
+                    state.todos.push(todo);
+                }
             });
+            if (todos.length > 0) {
+                state.lastId = todos[todos.length - 1].id;
+            }
+            scheduleRender();
         })
         .catch(error => {
             // Executes if any error occurred during the fetch operation.
             loading.style.display = 'none';
+            state.loading = false;
             console.error('Error fetching TODOs:', error);
+            state.nodes.clear();
             todoList.innerHTML = '<p>Error loading TODOs. Please try again later.</p>';
         });
 }
 
+// Schedules a single render of the visible window for the next animation frame, coalescing bursts of scroll events and mutations.
+function scheduleRender() {
+    if (!state.renderQueued) {
+        state.renderQueued = true;
+        window.requestAnimationFrame(renderWindow);
+    }
+}
+
+// Renders only the TODO items that fall inside the visible part of the page (plus OVERSCAN rows on each side).
+// Rows that are already rendered are kept in place, new rows are inserted in batches through a DocumentFragment and rows that left the window are removed.
+function renderWindow() {
+    state.renderQueued = false;
+    const todoList = document.getElementById('todo-list');
+
+    // If there are no TODOs, it displays a message indicating that.
+    if (state.todos.length === 0) {
+        state.nodes.clear();
+        if (!state.hasMore) {
+            todoList.innerHTML = '<p>No TODOs found. Create your first one above!</p>';
+        }
+        return;
+    }
+    if (topSpacer.parentNode !== todoList) {
+        todoList.replaceChildren(topSpacer, bottomSpacer); // drops the empty/error message
+    }
+
+    // Work out which rows are visible from the scroll position, relative to the top of the list.
+    const listTop = todoList.getBoundingClientRect().top + window.scrollY;
+    const scrolledIntoList = Math.max(0, window.scrollY - listTop);
+    const first = Math.max(0, Math.floor(scrolledIntoList / state.rowHeight) - OVERSCAN);
+    const last = Math.min(state.todos.length, first + Math.ceil(window.innerHeight / state.rowHeight) + 2 * OVERSCAN);
+
+    // Remove the rows that are no longer inside the window.
+    state.nodes.forEach((node, id) => {
+        const position = state.positions.get(id);
+        if (position === undefined || position < first || position >= last) {
+            node.remove();
+            state.nodes.delete(id);
+        }
+    });
+
+    // Walk the window in order, reusing rendered rows and batching runs of new rows into a fragment inserted in a single DOM write.
+    let cursor = topSpacer.nextSibling;
+    let fragment = document.createDocumentFragment();
+    for (let i = first; i < last; i++) {
+        const todo = state.todos[i];
+        const existing = state.nodes.get(todo.id);
+        if (existing) {
+            if (fragment.childNodes.length > 0) {
+                todoList.insertBefore(fragment, existing);
+                fragment = document.createDocumentFragment();
+            }
+            cursor = existing.nextSibling;
+        } else {
+            const node = createTodoElement(todo);
+            state.nodes.set(todo.id, node);
+            fragment.appendChild(node);
+        }
+    }
+    todoList.insertBefore(fragment, cursor);
+
+    // Size the spacers for the rows that are not rendered.
+    topSpacer.style.height = `${first * state.rowHeight}px`;
+    bottomSpacer.style.height = `${(state.todos.length - last) * state.rowHeight}px`;
+
+    // Refine the row height estimate from the rendered rows (including the margins between them).
+    const renderedCount = last - first;
+    if (renderedCount > 1) {
+        const firstNode = topSpacer.nextSibling;
+        const lastNode = bottomSpacer.previousSibling;
+        const measured = (lastNode.getBoundingClientRect().bottom - firstNode.getBoundingClientRect().top) / renderedCount;
+        if (measured > 0) {
+            state.rowHeight = measured;
+        }
+    }
+
+    // Load the next page once the window gets close to the end of the loaded rows.
+    if (last >= state.todos.length - OVERSCAN) {
+        fetchNextPage();
+    }
+}
+
+// Adds a TODO item returned by the server to the client state.
+function insertTodo(todo) {
+    if (state.hasMore) {
+        return; // new ids sort last, the item will arrive with the remaining pages
+    }
+    state.positions.set(todo.id, state.todos.length);
+    state.todos.push(todo);
+    state.lastId = todo.id;
+    scheduleRender();
+}
+
+// Replaces a TODO item with the version returned by the server, patching its row in place if it is rendered.
+function patchTodo(todo) {
+    const position = state.positions.get(todo.id);
+    if (position === undefined) {
+        return;
+    }
+    state.todos[position] = todo;
+    const node = state.nodes.get(todo.id);
+    if (node) {
+        const replacement = createTodoElement(todo);
+        node.replaceWith(replacement);
+        state.nodes.set(todo.id, replacement);
+    }
+}
+
+// Removes a TODO item from the client state and its row from the DOM.
+function removeTodo(id) {
+    const position = state.positions.get(id);
+    if (position === undefined) {
+        return;
+    }
+    state.todos.splice(position, 1);
+    state.positions.delete(id);
+    for (let i = position; i < state.todos.length; i++) {
+        state.positions.set(state.todos[i].id, i); // shift the positions of the following rows
+    }
+    const node = state.nodes.get(id);
+    if (node) {
+        node.remove();
+        state.nodes.delete(id);
+    }
+    scheduleRender();
+}
+
 // Gathers data from the create TODO form and sends it to the server to create a new TODO item.
 function createTodo() {
     // Retrieves the values entered by the user in the title and description input fields.
@@ -85,8 +265,8 @@ function createTodo() {
         document.getElementById('title').value = '';
         document.getElementById('description').value = '';
 
-        // Refreshes the entire list of TODOs to include the newly added item.
-        fetchTodos();
+        // Adds the created item returned by the server, no need to reload the list.
+        insertTodo(newTodo);
     })
     .catch(error => {
         console.error('Error creating todo:', error); // logs the error
@@ -94,8 +274,9 @@ function createTodo() {
     })
 }
 
-// Sends updated data for a specific TODO item to the server, where 'id' is the unique identifier and 'data' is an object containing the fields to be updated
-function updateTodo(id, data) {
+// Sends updated data for a specific TODO item to the server, where 'id' is the unique identifier and 'data' is an object containing the fields to be updated.
+// The optional 'onError' callback lets callers roll back optimistic changes.
+function updateTodo(id, data, onError) {
     // Makes an asynchronous HTTP PUT request to '/api/todos/{id}' endpoint.
     fetch(`/api/todos/${id}`, {
         method: 'PUT',
@@ -112,11 +293,14 @@ function updateTodo(id, data) {
         return response.json();
     })
     .then(updatedTodo => {
-        // After a successful update, refresh the entire TODO list to reflect the changes.
-        fetchTodos();
+        // After a successful update, patch only the affected row with the item returned by the server.
+        patchTodo(updatedTodo);
     })
     .catch(error => {
         console.error('Error updating todo:', error); // Log the error
+        if (onError) {
+            onError();
+        }
         // Alert the user about the failure to update.
         alert('Failed to update TODO: ' + (error.message || 'Unknown error'));
     });
@@ -140,8 +324,8 @@ function deleteTodo(id) {
         return response.json();
     })
     .then(data => {
-        // After successful deletion, refresh the TODO list.
-        fetchTodos();
+        // After successful deletion, remove only the deleted row.
+        removeTodo(id);
     })
     .catch(error => {
         console.error('Error deleting todo:', error); // Log the error.
@@ -150,9 +334,32 @@ function deleteTodo(id) {
 }
 
 // Toggles the completion status of a TODO item (such as 'incomplete' to 'complete').
+// The row is updated immediately and the request is debounced, so a burst of clicks sends at most one PUT with the final status (none if it ends where it started).
 function toggleTodoStatus(id, currentStatus) {
+    let pending = pendingToggles.get(id);
+    if (pending) {
+        clearTimeout(pending.timer);
+    } else {
+        pending = { original: currentStatus };
+        pendingToggles.set(id, pending);
+    }
     // The new status is the opposite of the current status.
-    updateTodo(id, { completed: !currentStatus});
+    pending.desired = !currentStatus;
+    patchTodo({ ...state.todos[state.positions.get(id)], completed: pending.desired });
+
+    pending.timer = setTimeout(function() {
+        pendingToggles.delete(id);
+        if (pending.desired === pending.original) {
+            return; // the clicks cancelled each other out
+        }
+        updateTodo(id, { completed: pending.desired }, function() {
+            // Roll the row back to the server's status if the update failed.
+            const position = state.positions.get(id);
+            if (position !== undefined) {
+                patchTodo({ ...state.todos[position], completed: pending.original });
+            }
+        });
+    }, TOGGLE_DEBOUNCE_MS);
 }
 
 // Creates and returns an HTML list item (<li>) element representing a single TODO item.
@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, jsonify, abort, request, current_app, has_app_context, has_request_context
+
+DEFAULT_TENANT = 'default'
+
+_tenant_override = ContextVar('tenant_override', default=None)
+
+class TenantQuotaExceeded(Exception):
+    """Raised when a tenant already holds TENANT_MAX_TODOS live todos."""
+
+
+def init_app(app):
+    """Configure tenant resolution and quotas.
+
+    API requests are mapped to a tenant by the API key sent in TENANT_API_KEY_HEADER (see TENANT_API_KEYS). Requests without a key belong to
+    TENANT_DEFAULT unless TENANT_REQUIRE_API_KEY is set, so single-tenant deployments keep working unchanged. Creating a todo beyond
+    TENANT_MAX_TODOS live todos (0 disables the quota) returns 403.
+    """
+    app.config.setdefault('TENANT_API_KEYS', {}) # API key -> tenant ID
+    app.config.setdefault('TENANT_API_KEY_HEADER', 'X-API-Key')
+    app.config.setdefault('TENANT_DEFAULT', DEFAULT_TENANT)
+    app.config.setdefault('TENANT_REQUIRE_API_KEY', False)
+    app.config.setdefault('TENANT_MAX_TODOS', 0)
+    app.register_error_handler(TenantQuotaExceeded, _quota_exceeded)
+
+def authenticate():
+    """Resolve the tenant of the current request from its API key, registered as a before_request handler of the API blueprint."""
+    api_key = request.headers.get(current_app.config['TENANT_API_KEY_HEADER'])
+    if api_key:
+        tenant_id = current_app.config['TENANT_API_KEYS'].get(api_key)
+        if tenant_id is None:
+            current_app.logger.warning(f"Rejected request with an unknown API key to {request.path}.")
+            abort(401, description="Invalid API key")
+    elif current_app.config['TENANT_REQUIRE_API_KEY']:
+        abort(401, description="API key required")
+    else:
+        tenant_id = current_app.config['TENANT_DEFAULT']
+    g.tenant_id = tenant_id
+
+@contextmanager
+def tenant_scope(tenant_id):
+    """Run code outside of an API request (CLI commands, scripts) as the given tenant."""
+    token = _tenant_override.set(tenant_id)
+    try:
+        yield
+    finally:
+        _tenant_override.reset(token)
+
+def current_tenant():
+    """The tenant of the enclosing tenant_scope or API request, otherwise TENANT_DEFAULT (e.g. background jobs)."""
+    scoped = _tenant_override.get()
+    if scoped is not None:
+        return scoped
+    if has_request_context() and 'tenant_id' in g:
+        return g.tenant_id
+    if has_app_context():
+        return current_app.config['TENANT_DEFAULT']
+    return DEFAULT_TENANT
+
+def _quota_exceeded(err):
+    current_app.logger.warning(f"Tenant quota exceeded: {err}")
+    response = jsonify({'description': str(err)})
+    response.status_code = 403
+    return response
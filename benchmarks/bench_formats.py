@@ -0,0 +1,49 @@
+"""Compare wire size and encode/decode time of the /api/todos payload in every supported format.
+
+Usage:
+    python benchmarks/bench_formats.py [--items 1000] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.formats import BINARY_CODECS, MSGPACK_MIMETYPES, CBOR_MIMETYPE
+from app.models import Todo
+from app.schemas import todos_schema
+
+def build_payload(items):
+    now = datetime.now(timezone.utc)
+    todos = [
+        Todo(id=i, title=f"Todo number {i}", description="Benchmark description " * 3, completed=i % 3 == 0, created_at=now, updated_at=now)
+        for i in range(1, items + 1)
+    ]
+    return todos_schema.dump(todos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=1000, help='number of todos in the list payload')
+    parser.add_argument('--repeat', type=int, default=200, help='encode/decode iterations per format')
+    args = parser.parse_args()
+
+    payload = build_payload(args.items)
+    codecs = {'json': (lambda data: json.dumps(data, separators=(',', ':')).encode(), json.loads)} # jsonify's compact output
+    for name, mimetype in (('msgpack', MSGPACK_MIMETYPES[0]), ('cbor', CBOR_MIMETYPE)):
+        if mimetype in BINARY_CODECS:
+            codecs[name] = BINARY_CODECS[mimetype]
+
+    print(f"{args.items} todos, {args.repeat} iterations")
+    print(f"{'format':<10}{'bytes':>12}{'encode us':>14}{'decode us':>14}")
+    for name, (encode, decode) in codecs.items():
+        raw = encode(payload)
+        assert decode(raw) == payload
+        encode_us = timeit.timeit(lambda: encode(payload), number=args.repeat) / args.repeat * 1e6
+        decode_us = timeit.timeit(lambda: decode(raw), number=args.repeat) / args.repeat * 1e6
+        print(f"{name:<10}{len(raw):>12}{encode_us:>14.1f}{decode_us:>14.1f}")
+
+if __name__ == '__main__':
+    main()
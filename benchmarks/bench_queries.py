@@ -0,0 +1,65 @@
+"""Measure per-call cost of the hot TodoService reads, legacy Todo.query building versus the cached lambda statements.
+
+Runs against an in-memory SQLite database by default, so the numbers are dominated by the Python-side statement overhead.
+
+Usage:
+    python benchmarks/bench_queries.py [--rows 1000] [--repeat 2000] [--database-url sqlite://]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Todo
+from app.services.todo_db_service import TodoService
+from config import TestingConfig
+
+def legacy_get_by_id(todo_id):
+    db.session.expunge_all() # force a query instead of an identity map hit
+    todo = Todo.query.get(todo_id)
+    return todo if todo is not None and todo.deleted_at is None else None
+
+def legacy_page(after_id, limit):
+    return Todo.query.filter(Todo.deleted_at.is_(None), Todo.id > after_id).order_by(Todo.id).limit(limit).all()
+
+def cached_get_by_id(todo_id):
+    db.session.expunge_all()
+    return TodoService.get_todo_by_id(todo_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000, help='todos in the table')
+    parser.add_argument('--repeat', type=int, default=2000, help='calls per case')
+    parser.add_argument('--database-url', default='sqlite://', help='SQLAlchemy URL of the database to benchmark')
+    args = parser.parse_args()
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = args.database_url
+        LOG_LEVEL = 'WARNING'
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Todo(title=f"Todo {i}", description="Benchmark") for i in range(args.rows)])
+        db.session.commit()
+        middle = args.rows // 2
+
+        cases = [
+            ('get by id, legacy', lambda: legacy_get_by_id(middle)),
+            ('get by id, cached', lambda: cached_get_by_id(middle)),
+            ('page of 50, legacy', lambda: legacy_page(middle, 50)),
+            ('page of 50, cached', lambda: TodoService.get_todos_page(middle, 50)),
+        ]
+        print(f"{args.rows} rows, {args.repeat} calls per case")
+        print(f"{'case':<24}{'us/call':>12}")
+        for name, func in cases:
+            func() # warm the compiled cache
+            seconds = timeit.timeit(func, number=args.repeat)
+            print(f"{name:<24}{seconds / args.repeat * 1e6:>12.1f}")
+        db.drop_all()
+
+if __name__ == '__main__':
+    main()
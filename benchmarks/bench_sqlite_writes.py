@@ -0,0 +1,64 @@
+"""Measure concurrent create/list throughput on the SQLite profile with and without the WAL tuning.
+
+Usage:
+    python benchmarks/bench_sqlite_writes.py [--threads 8] [--ops 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models import Todo
+from app.services.todo_db_service import TodoService
+from config import TestingConfig
+
+def run(journal_mode, synchronous, threads, ops):
+    with tempfile.TemporaryDirectory() as directory:
+        class BenchConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'bench.sqlite3')}"
+            SQLITE_JOURNAL_MODE = journal_mode
+            SQLITE_SYNCHRONOUS = synchronous
+            LOG_LEVEL = 'WARNING'
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+
+        def worker(index):
+            with app.app_context():
+                for op in range(ops):
+                    if op % 2:
+                        TodoService.get_todos_page(0, 50)
+                    else:
+                        TodoService.create_todo(Todo(title=f"bench {index}-{op}"))
+                db.session.remove()
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        with app.app_context():
+            db.engine.dispose()
+        return threads * ops / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8, help='concurrent worker threads')
+    parser.add_argument('--ops', type=int, default=200, help='operations per thread, alternating create and list')
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.ops} ops each")
+    print(f"{'journal/synchronous':<24}{'ops/s':>12}")
+    for journal_mode, synchronous in (('DELETE', 'FULL'), ('WAL', 'FULL'), ('WAL', 'NORMAL')):
+        print(f"{journal_mode + '/' + synchronous:<24}{run(journal_mode, synchronous, args.threads, args.ops):>12.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Measure per-request validation cost of todo_schema.load versus the todo_payload_validator fast path.
+
+Usage:
+    python benchmarks/bench_validation.py [--repeat 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.schemas import todo_schema, todo_payload_validator
+
+CREATE_PAYLOAD = {"title": "Benchmark todo", "description": "A description of moderate length", "completed": False}
+UPDATE_PAYLOAD = {"completed": True}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20000, help='validations per case')
+    args = parser.parse_args()
+
+    cases = [
+        ('POST schema.load', lambda: todo_schema.load(CREATE_PAYLOAD)),
+        ('POST fast path', lambda: todo_payload_validator.validate(CREATE_PAYLOAD)),
+        ('PUT schema.load', lambda: todo_schema.load(UPDATE_PAYLOAD, partial=True)),
+        ('PUT fast path', lambda: todo_payload_validator.validate(UPDATE_PAYLOAD, partial=True)),
+    ]
+    print(f"{'case':<20}{'us/request':>12}")
+    for name, func in cases:
+        seconds = timeit.timeit(func, number=args.repeat)
+        print(f"{name:<20}{seconds / args.repeat * 1e6:>12.2f}")
+
+if __name__ == '__main__':
+    main()
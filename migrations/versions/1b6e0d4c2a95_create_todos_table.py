@@ -0,0 +1,35 @@
+"""create todos table
+
+Revision ID: 1b6e0d4c2a95
+Revises: 
+Create Date: 2026-10-18 08:55:12.640318
+
+The original schema of database/todos_schema.sql. A new database is created with 'flask db upgrade' alone, a database already created
+from todos_schema.sql is brought under the migrations with 'flask db stamp 1b6e0d4c2a95' followed by 'flask db upgrade'.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b6e0d4c2a95'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('todos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=150), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('completed', sa.Boolean(), server_default=sa.false(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('todos')
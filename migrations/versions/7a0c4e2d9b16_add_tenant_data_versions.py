@@ -0,0 +1,28 @@
+"""tenant_data_versions table keying the response cache
+
+Revision ID: 7a0c4e2d9b16
+Revises: e52b8d1f6a07
+Create Date: 2026-10-18 20:31:07.918245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a0c4e2d9b16'
+down_revision = 'e52b8d1f6a07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tenant_data_versions',
+    sa.Column('tenant_id', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+
+
+def downgrade():
+    op.drop_table('tenant_data_versions')
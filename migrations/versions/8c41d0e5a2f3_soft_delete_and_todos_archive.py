@@ -0,0 +1,57 @@
+"""soft delete column and range-partitioned todos_archive table
+
+Revision ID: 8c41d0e5a2f3
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-18 10:27:05.114873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41d0e5a2f3'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('todos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Monthly partitions are created on demand by the archival job, the default partition catches anything else
+        op.execute("""
+            CREATE TABLE todos_archive (
+                id INTEGER NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                title VARCHAR(150) NOT NULL,
+                description TEXT,
+                completed BOOLEAN NOT NULL DEFAULT FALSE,
+                updated_at TIMESTAMP WITH TIME ZONE,
+                deleted_at TIMESTAMP WITH TIME ZONE,
+                archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        op.execute("CREATE TABLE todos_archive_default PARTITION OF todos_archive DEFAULT")
+    else:
+        op.create_table('todos_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('title', sa.String(length=150), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at')
+        )
+
+
+def downgrade():
+    op.drop_table('todos_archive') # drops every partition on PostgreSQL
+
+    with op.batch_alter_table('todos', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
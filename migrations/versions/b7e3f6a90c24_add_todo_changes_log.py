@@ -0,0 +1,39 @@
+"""todo_changes log for incremental delta sync
+
+Revision ID: b7e3f6a90c24
+Revises: 8c41d0e5a2f3
+Create Date: 2026-10-18 12:03:48.675201
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f6a90c24'
+down_revision = '8c41d0e5a2f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('todo_changes',
+    sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('todo_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('todo_changes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_todo_changes_todo_id'), ['todo_id'], unique=False)
+
+    # Backfill one upsert per existing todo so a first sync (no token) returns the whole list
+    op.execute("INSERT INTO todo_changes (todo_id, op) SELECT id, 'upsert' FROM todos WHERE deleted_at IS NULL ORDER BY id")
+
+
+def downgrade():
+    with op.batch_alter_table('todo_changes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_todo_changes_todo_id'))
+
+    op.drop_table('todo_changes')
@@ -0,0 +1,41 @@
+"""todo_stats summary table of per-day todo counts
+
+Revision ID: c9d2e4f7a183
+Revises: 7a0c4e2d9b16
+Create Date: 2026-10-18 22:04:51.330716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d2e4f7a183'
+down_revision = '7a0c4e2d9b16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('todo_stats',
+    sa.Column('tenant_id', sa.String(length=64), nullable=False),
+    sa.Column('day', sa.String(length=10), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id', 'day')
+    )
+    # Count the existing live and archived todos, the same grouping as TodoStats.reconcile()
+    op.execute("""
+        INSERT INTO todo_stats (tenant_id, day, total, completed)
+        SELECT tenant_id, COALESCE(CAST(date(created_at) AS VARCHAR(10)), ''), COUNT(*), SUM(CASE WHEN completed THEN 1 ELSE 0 END)
+        FROM (
+            SELECT tenant_id, created_at, completed FROM todos WHERE deleted_at IS NULL
+            UNION ALL
+            SELECT tenant_id, created_at, completed FROM todos_archive WHERE deleted_at IS NULL
+        ) AS live
+        GROUP BY tenant_id, COALESCE(CAST(date(created_at) AS VARCHAR(10)), '')
+    """)
+
+
+def downgrade():
+    op.drop_table('todo_stats')
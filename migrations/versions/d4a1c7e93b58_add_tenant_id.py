@@ -0,0 +1,46 @@
+"""tenant_id on todos, todos_archive and todo_changes with tenant-leading indexes
+
+Revision ID: d4a1c7e93b58
+Revises: b7e3f6a90c24
+Create Date: 2026-10-18 15:41:22.308917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a1c7e93b58'
+down_revision = 'b7e3f6a90c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows belong to the default tenant, the server default backfills them
+    with op.batch_alter_table('todos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tenant_id', sa.String(length=64), server_default='default', nullable=False))
+        batch_op.create_index('ix_todos_tenant_id_live', ['tenant_id', 'id'], unique=False,
+                              postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'))
+
+    with op.batch_alter_table('todos_archive', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tenant_id', sa.String(length=64), server_default='default', nullable=False))
+        batch_op.create_index('ix_todos_archive_tenant_id_id', ['tenant_id', 'id'], unique=False)
+
+    with op.batch_alter_table('todo_changes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tenant_id', sa.String(length=64), server_default='default', nullable=False))
+        batch_op.create_index('ix_todo_changes_tenant_id_seq', ['tenant_id', 'seq'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('todo_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_todo_changes_tenant_id_seq')
+        batch_op.drop_column('tenant_id')
+
+    with op.batch_alter_table('todos_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_todos_archive_tenant_id_id')
+        batch_op.drop_column('tenant_id')
+
+    with op.batch_alter_table('todos', schema=None) as batch_op:
+        batch_op.drop_index('ix_todos_tenant_id_live')
+        batch_op.drop_column('tenant_id')
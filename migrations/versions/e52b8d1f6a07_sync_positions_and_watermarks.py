@@ -0,0 +1,42 @@
+"""writing transaction ID on todo_changes and per-tenant compaction watermarks
+
+Revision ID: e52b8d1f6a07
+Revises: d4a1c7e93b58
+Create Date: 2026-10-18 19:12:40.552031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e52b8d1f6a07'
+down_revision = 'd4a1c7e93b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows get 0 and keep their seq order, they all committed before any row written from now on
+    with op.batch_alter_table('todo_changes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('xid', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.drop_index('ix_todo_changes_tenant_id_seq')
+        batch_op.create_index('ix_todo_changes_tenant_id_xid_seq', ['tenant_id', 'xid', 'seq'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE todo_changes ALTER COLUMN xid SET DEFAULT txid_current()") # also covers rows inserted outside the app
+
+    op.create_table('todo_sync_watermarks',
+    sa.Column('tenant_id', sa.String(length=64), nullable=False),
+    sa.Column('xid', sa.BigInteger(), nullable=False),
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+
+
+def downgrade():
+    op.drop_table('todo_sync_watermarks')
+
+    with op.batch_alter_table('todo_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_todo_changes_tenant_id_xid_seq')
+        batch_op.create_index('ix_todo_changes_tenant_id_seq', ['tenant_id', 'seq'], unique=False)
+        batch_op.drop_column('xid')
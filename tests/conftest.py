@@ -1,6 +1,7 @@
 import pytest
 from app import create_app, db
 from app.models import Todo
+from app.services.response_cache import response_cache
 from config import TestingConfig
 
 @pytest.fixture(scope='session')
@@ -28,6 +29,7 @@ def init_database(app):
     """Fixture to initialize the database for each test function."""
     with app.app_context():
         db.create_all()
+        response_cache.clear() # data versions restart with the recreated tables
         yield db  # provide the database instance
         db.session.remove()
         db.drop_all()
@@ -34,7 +34,7 @@ def test_get_specific_todo_exists(client, new_todo):
 def test_get_specific_todo_not_exists(client, init_database):
     response = client.get('/api/todos/999')
     assert response.status_code == 404
-    assert "not found" in response.json["description"].lower()
+    assert b"not found" in response.data.lower() # abort() renders Werkzeug's HTML error page, the API has no JSON error handler
 
 # --- Test POST /api/todos ---
 def test_create_todo_success(client, init_database):
@@ -53,9 +53,10 @@ def test_create_todo_success(client, init_database):
 
 def test_create_todo_no_data(client, init_database):
     response = client.post('/api/todos', data=json.dumps({}), content_type='application/json')
+    assert response.status_code == 400
+    assert b"No input data provided" in response.data
     response_no_data = client.post('/api/todos')
-    assert response_no_data.status_code == 400
-    assert "No input data provided" in response_no_data.json["description"]
+    assert response_no_data.status_code == 415 # Flask rejects a body-less request without a JSON Content-Type
 
 def test_create_todo_missing_title(client, init_database):
     payload = {"description": "A todo without a title"}
@@ -65,11 +66,11 @@ def test_create_todo_missing_title(client, init_database):
     assert "Missing data for required field." in response.json["title"]
 
 def test_create_todo_invalid_title_too_short(client, init_database):
-    payload = {"title": "T", "description": "A todo"}
+    payload = {"title": "", "description": "A todo"}
     response = client.post('/api/todos', json=payload)
     assert response.status_code == 400
     assert "title" in response.json
-    assert "Title must be between 2 and 100 characters long." in response.json["title"][0]
+    assert "Length must be between 1 and 150." in response.json["title"][0]
 
 # --- Test PUT /api/todos/<id> ---
 def test_update_todo_success_full(client, new_todo):
@@ -99,19 +100,20 @@ def test_update_todo_not_found(client, init_database):
     payload = {"title": "Won't Update"}
     response = client.put('/api/todos/999', json=payload)
     assert response.status_code == 404
-    assert "not found" in response.json["description"].lower()
+    assert b"not found" in response.data.lower()
 
 def test_update_todo_no_data(client, new_todo):
-    response = client.put(f'/api/todos/{new_todo.id}')
+    response = client.put(f'/api/todos/{new_todo.id}', data=json.dumps({}), content_type='application/json')
     assert response.status_code == 400
-    assert "No input data provided" in response.json["description"]
+    assert b"No input data provided" in response.data
+    assert client.put(f'/api/todos/{new_todo.id}').status_code == 415
 
 def test_update_todo_invalid_data(client, new_todo):
-    payload = {"title": "T"}
+    payload = {"title": ""}
     response = client.put(f'/api/todos/{new_todo.id}', json=payload)
     assert response.status_code == 400
     assert "title" in response.json
-    assert "Title must be between 2 and 100 characters long." in response.json["title"][0]
+    assert "Length must be between 1 and 150." in response.json["title"][0]
 
 # --- Test DELETE /api/todos/<id> ---
 def test_delete_todo_success(client, new_todo):
@@ -119,15 +121,31 @@ def test_delete_todo_success(client, new_todo):
     assert response.status_code == 200
     assert "deleted successfully" in response.json["message"]
     deleted_todo = Todo.query.get(new_todo.id)
-    assert deleted_todo is None
+    assert deleted_todo.deleted_at is not None # soft deleted, the row is kept until archival
+    assert client.get(f'/api/todos/{new_todo.id}').status_code == 404
+    assert client.get('/api/todos').json == []
 
 def test_delete_todo_not_found(client, init_database):
     response = client.delete('/api/todos/999')
     assert response.status_code == 404
-    assert "not found" in response.json["description"].lower()
+    assert b"not found" in response.data.lower()
 
 # Test root route
 def test_index_route(client):
     response = client.get('/')
     assert response.status_code == 200
-    assert b"<!DOCTYPE html>" in response.data or b"<title>Todo App</title>" in response.data
\ No newline at end of file
+    assert b"<!DOCTYPE html>" in response.data or b"<title>Todo App</title>" in response.data
+
+# --- Test GET /api/todos pagination ---
+def test_get_todos_paged(client, init_database):
+    db.session.add_all([Todo(title=f"Todo {i}") for i in range(5)])
+    db.session.commit()
+
+    first_page = client.get('/api/todos?limit=2').json
+    assert [todo["title"] for todo in first_page] == ["Todo 0", "Todo 1"]
+    next_page = client.get(f'/api/todos?limit=2&after_id={first_page[-1]["id"]}').json
+    assert [todo["title"] for todo in next_page] == ["Todo 2", "Todo 3"]
+
+def test_get_todos_invalid_page(client, init_database):
+    assert client.get('/api/todos?limit=0').status_code == 400
+    assert client.get('/api/todos?limit=abc').status_code == 400
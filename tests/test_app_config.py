@@ -1,3 +1,4 @@
+import pytest
 from flask import Flask
 from config import Config, DevelopmentConfig, TestingConfig, ProductionConfig
 
@@ -33,6 +34,7 @@ def test_production_config(app):
 from app import create_app
 
 def test_create_app_development():
+    pytest.importorskip('psycopg2', reason="DevelopmentConfig uses PostgreSQL, creating its engine needs the psycopg2 driver")
     app = create_app(DevelopmentConfig)
     assert app.config['DEBUG'] is True
     assert app.config['TESTING'] is False
@@ -43,6 +45,7 @@ def test_create_app_testing():
     assert 'sqlite:///:memory:' in app.config['SQLALCHEMY_DATABASE_URI']
 
 def test_create_app_production():
+    pytest.importorskip('psycopg2', reason="ProductionConfig uses PostgreSQL, creating its engine needs the psycopg2 driver")
     app = create_app(ProductionConfig)
     assert app.config['DEBUG'] is False
     assert app.config['TESTING'] is False
\ No newline at end of file
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from app.models import Todo, TodoArchive
+from app.services.todo_archive_service import TodoArchiveService
+from app.services.todo_stats_service import todo_stats
+from app import db
+
+def _old(days):
+    return datetime.utcnow() - timedelta(days=days)
+
+def test_archive_moves_old_completed_and_deleted(init_database):
+    done = Todo(title="Old done", completed=True, created_at=_old(90), updated_at=_old(60))
+    deleted = Todo(title="Old deleted", created_at=_old(90), deleted_at=_old(45))
+    recent = Todo(title="Recently done", completed=True)
+    live = Todo(title="Still open", created_at=_old(90))
+    db.session.add_all([done, deleted, recent, live])
+    db.session.commit()
+
+    assert TodoArchiveService.archive_todos(30, batch_size=1) == 2
+    assert {todo.title for todo in Todo.query.all()} == {"Recently done", "Still open"}
+    assert {todo.title for todo in TodoArchive.query.all()} == {"Old done", "Old deleted"}
+
+def test_include_archived_reads(client, init_database):
+    done = Todo(title="Archived done", completed=True, created_at=_old(90), updated_at=_old(60))
+    db.session.add_all([done, Todo(title="Hot")])
+    db.session.commit()
+    archived_id = done.id
+    TodoArchiveService.archive_todos(30)
+
+    assert [todo["title"] for todo in client.get('/api/todos').json] == ["Hot"]
+    assert len(client.get('/api/todos?include_archived=true').json) == 2
+    assert client.get(f'/api/todos/{archived_id}').status_code == 404
+    response = client.get(f'/api/todos/{archived_id}?include_archived=true')
+    assert response.status_code == 200
+    assert response.json["title"] == "Archived done"
+
+def test_archived_todos_still_counted(client, init_database):
+    db.session.add(Todo(title="Archived done", completed=True, created_at=_old(90), updated_at=_old(60)))
+    db.session.commit()
+    TodoArchiveService.archive_todos(30)
+    todo_stats.reconcile() # the todo was written directly, recount it from the archive
+    assert client.get('/api/todos/stats').json == {"total": 1, "completed": 1, "open": 0}
+
+def test_archive_cli_command(runner, init_database):
+    db.session.add(Todo(title="Old deleted", created_at=_old(90), deleted_at=_old(45)))
+    db.session.commit()
+    result = runner.invoke(args=['todos', 'archive', '--days', '30'])
+    assert "Archived 1 todos." in result.output
+
+def test_archive_table_partitioned_on_postgresql():
+    ddl = str(CreateTable(TodoArchive.__table__).compile(dialect=postgresql.dialect()))
+    assert 'PARTITION BY RANGE (created_at)' in ddl
+
+def test_partition_bounds_computed_in_utc():
+    sql = str(TodoArchiveService._partition_ddl([1]).compile(dialect=postgresql.dialect()))
+    assert "date_trunc(%(date_trunc_1)s, timezone(%(timezone_3)s, coalesce(todos.created_at, now())))" in sql # month of the UTC wall clock
+    assert "anon_1.month + interval '1 month'" in sql # the end bound is not derived from a local offset
+    assert "format(%(format_2)s" in sql # the partition name and bounds are quoted by the database, not interpolated
@@ -0,0 +1,35 @@
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+
+def test_json_is_default(client, new_todo):
+    response = client.get('/api/todos')
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.headers['Vary']
+
+def test_get_todos_msgpack(client, new_todo):
+    response = client.get('/api/todos', headers={'Accept': 'application/msgpack'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/msgpack'
+    data = msgpack.unpackb(response.data, raw=False)
+    assert data[0]["id"] == new_todo.id
+    assert data[0]["title"] == new_todo.title
+
+def test_create_todo_msgpack_body(client, init_database):
+    payload = msgpack.packb({"title": "Binary Todo", "description": "Sent as MessagePack"})
+    response = client.post('/api/todos', data=payload, content_type='application/msgpack',
+                           headers={'Accept': 'application/msgpack'})
+    assert response.status_code == 201
+    data = msgpack.unpackb(response.data, raw=False)
+    assert data["title"] == "Binary Todo"
+
+def test_update_todo_msgpack_validation_error(client, new_todo):
+    payload = msgpack.packb({"title": ""})
+    response = client.put(f'/api/todos/{new_todo.id}', data=payload, content_type='application/msgpack',
+                          headers={'Accept': 'application/msgpack'})
+    assert response.status_code == 400
+    assert "title" in msgpack.unpackb(response.data, raw=False)
+
+def test_malformed_msgpack_body(client, init_database):
+    response = client.post('/api/todos', data=b'\xc1', content_type='application/msgpack')
+    assert response.status_code == 400
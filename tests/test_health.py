@@ -0,0 +1,28 @@
+def test_healthz(client):
+    response = client.get('/healthz')
+    assert response.status_code == 200
+    assert response.json == {"status": "ok"}
+
+def test_readyz_reports_database_latency(app, client):
+    app.extensions['readiness']['checked_at'] = None # drop any cached probe
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.json["status"] == "ready"
+    assert response.json["database"]["latency_ms"] >= 0
+    assert "class" in response.json["pool"]
+    assert response.json["cached"] is False
+
+def test_readyz_is_cached(app, client):
+    app.extensions['readiness']['checked_at'] = None
+    client.get('/readyz')
+    assert client.get('/readyz').json["cached"] is True
+
+def test_readyz_unavailable_on_probe_failure(app, client, monkeypatch):
+    def failing_probe(app):
+        raise ConnectionError("database down")
+    monkeypatch.setattr('app.health._probe_database', failing_probe)
+    app.extensions['readiness']['checked_at'] = None
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.json["status"] == "unavailable"
+    app.extensions['readiness']['checked_at'] = None
@@ -0,0 +1,73 @@
+import pytest
+from app.models import Job
+from app.services.job_queue import job_queue
+from app import db
+
+calls = []
+
+@job_queue.task('test.record')
+def record_call(value):
+    calls.append(value)
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+def test_job_runs_after_commit(init_database):
+    job_queue.enqueue('test.record', value=1)
+    assert calls == [] # nothing runs before the transaction commits
+    db.session.commit()
+    assert calls == [1]
+
+def test_job_discarded_on_rollback(init_database):
+    job_queue.enqueue('test.record', value=2)
+    db.session.rollback()
+    db.session.commit()
+    assert calls == []
+
+def test_enqueue_unknown_job(init_database):
+    with pytest.raises(KeyError):
+        job_queue.enqueue('test.missing')
+
+def test_todo_write_enqueues_job(client, init_database, monkeypatch):
+    written = []
+    monkeypatch.setitem(job_queue._handlers, 'todo.written', lambda todo_id, action: written.append((todo_id, action)))
+    response = client.post('/api/todos', json={"title": "Queued side effects"})
+    assert response.status_code == 201
+    assert written == [(response.json['id'], 'created')]
+
+def test_durable_job_persisted_and_deleted(app, init_database):
+    app.config['JOB_QUEUE_DURABLE'] = True
+    try:
+        job_queue.enqueue('test.record', value=3)
+        db.session.commit()
+    finally:
+        app.config['JOB_QUEUE_DURABLE'] = False
+    assert calls == [3]
+    assert Job.query.count() == 0 # deleted once the handler succeeded
+
+def test_durable_workers_start_on_first_request(app, client, init_database):
+    db.session.add(Job(name='test.record', payload={'value': 4})) # left over from a crashed process
+    db.session.commit()
+    app.config.update(JOB_QUEUE_DURABLE=True, JOB_QUEUE_EAGER=False)
+    try:
+        client.get('/healthz')
+        assert app.extensions['job_queue'].threads
+        assert job_queue.shutdown(timeout=5) is True
+    finally:
+        app.config.update(JOB_QUEUE_DURABLE=False, JOB_QUEUE_EAGER=True)
+        job_queue.init_app(app) # fresh queue state for the following tests
+    assert calls == [4]
+    assert Job.query.count() == 0
+
+def test_worker_threads_drain_on_shutdown(app, init_database):
+    app.config['JOB_QUEUE_EAGER'] = False
+    try:
+        for value in range(5):
+            job_queue.enqueue('test.record', value=value)
+        db.session.commit()
+        assert job_queue.shutdown(timeout=5) is True
+    finally:
+        app.config['JOB_QUEUE_EAGER'] = True
+        job_queue.init_app(app) # fresh queue state for the following tests
+    assert sorted(calls) == [0, 1, 2, 3, 4]
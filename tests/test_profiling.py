@@ -0,0 +1,43 @@
+import time
+import pytest
+from app import create_app
+from app.profiling import SamplingProfiler
+from config import TestingConfig
+
+@pytest.fixture()
+def profiled_client(monkeypatch, tmp_path):
+    monkeypatch.setattr(TestingConfig, 'PROFILING_SECRET', 'let-me-profile', raising=False)
+    monkeypatch.setattr(TestingConfig, 'PROFILING_DIR', str(tmp_path), raising=False)
+    return create_app('testing').test_client()
+
+def test_profile_requires_secret(profiled_client, tmp_path):
+    response = profiled_client.get('/healthz', headers={'X-Profile': 'wrong'})
+    assert 'X-Profile-Stats' not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+def test_profiled_request_stores_stats(profiled_client, tmp_path):
+    response = profiled_client.get('/healthz', headers={'X-Profile': 'let-me-profile'})
+    assert response.json == {"status": "ok"}
+    assert (tmp_path / response.headers['X-Profile-Stats']).exists()
+
+def test_profiled_request_text_output(profiled_client):
+    response = profiled_client.get('/healthz', headers={'X-Profile': 'let-me-profile', 'X-Profile-Output': 'text'})
+    assert response.mimetype == 'text/plain'
+    assert b'function calls' in response.data
+
+def test_profile_secret_not_accepted_in_query_string(profiled_client, tmp_path):
+    response = profiled_client.get('/healthz?__profile=let-me-profile')
+    assert 'X-Profile-Stats' not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+def test_sampling_profiler_writes_collapsed_stacks(tmp_path):
+    output_file = tmp_path / 'samples.folded'
+    sampler = SamplingProfiler(0.001, 60.0, str(output_file))
+    sampler.start()
+    time.sleep(0.05)
+    sampler.stop()
+    lines = output_file.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert ';' in stack or ':' in stack
+    assert int(count) > 0
@@ -0,0 +1,97 @@
+import time
+import pytest
+from sqlalchemy import text
+from app import db
+from app.services.response_cache import response_cache
+
+ACME = {'X-API-Key': 'acme-key'}
+GLOBEX = {'X-API-Key': 'globex-key'}
+
+@pytest.fixture()
+def cache(app, init_database, monkeypatch):
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_MAX_BYTES', 1024 * 1024)
+    monkeypatch.setitem(app.config, 'TENANT_API_KEYS', {'acme-key': 'acme', 'globex-key': 'globex'})
+    response_cache.clear() # start every test from an empty cache
+
+def test_repeated_list_served_from_cache(client, cache):
+    client.post('/api/todos', json={"title": "Cached"})
+    first = client.get('/api/todos')
+    second = client.get('/api/todos')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.data == first.data
+    assert second.mimetype == 'application/json'
+    assert 'Accept' in second.headers['Vary']
+
+def test_writes_invalidate(client, cache):
+    todo_id = client.post('/api/todos', json={"title": "Before"}).json['id']
+    client.get('/api/todos')
+    client.put(f'/api/todos/{todo_id}', json={"title": "After"})
+    response = client.get('/api/todos')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.json[0]['title'] == "After"
+
+    client.delete(f'/api/todos/{todo_id}')
+    assert client.get('/api/todos').json == []
+
+def test_write_by_another_process_invalidates_within_check_interval(app, client, cache, monkeypatch):
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_VERSION_CHECK_MS', 50)
+    client.get('/api/todos')
+    # Another worker process commits a todo and bumps the version, none of this process's code runs
+    db.session.execute(text("INSERT INTO todos (tenant_id, title, completed) VALUES ('default', 'Elsewhere', 0)"))
+    db.session.execute(text("INSERT INTO tenant_data_versions (tenant_id, version) VALUES ('default', 1)"))
+    db.session.commit()
+    assert client.get('/api/todos').headers['X-Cache'] == 'HIT' # the version is not read again before the interval passed
+    time.sleep(0.06)
+    response = client.get('/api/todos')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [todo['title'] for todo in response.json] == ["Elsewhere"]
+
+def test_own_writes_invalidate_without_waiting(app, client, cache, monkeypatch):
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_VERSION_CHECK_MS', 60 * 1000)
+    client.get('/api/todos')
+    client.post('/api/todos', json={"title": "Mine"})
+    response = client.get('/api/todos')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [todo['title'] for todo in response.json] == ["Mine"]
+
+def test_disabled_cache_skips_version_bumps(app, client, init_database, monkeypatch):
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_MAX_BYTES', 0)
+    client.post('/api/todos', json={"title": "Uncached"})
+    assert db.session.scalar(text("SELECT COUNT(*) FROM tenant_data_versions")) == 0 # writes take no version row lock
+
+def test_key_includes_query_and_format(client, cache):
+    client.post('/api/todos', json={"title": "Keyed"})
+    assert client.get('/api/todos?limit=10&after_id=0').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/todos?after_id=0&limit=10').headers['X-Cache'] == 'HIT' # parameter order does not matter
+    assert client.get('/api/todos?limit=5').headers['X-Cache'] == 'MISS'
+    msgpack = client.get('/api/todos', headers={'Accept': 'application/msgpack'})
+    assert client.get('/api/todos', headers={'Accept': 'application/msgpack'}).data == msgpack.data
+    assert client.get('/api/todos').data != msgpack.data
+
+def test_tenants_cached_separately(client, cache):
+    client.post('/api/todos', json={"title": "Acme"}, headers=ACME)
+    client.get('/api/todos', headers=ACME)
+    client.get('/api/todos', headers=GLOBEX)
+    client.post('/api/todos', json={"title": "Globex"}, headers=GLOBEX)
+    assert client.get('/api/todos', headers=ACME).headers['X-Cache'] == 'HIT' # another tenant's write keeps this entry
+    assert [todo['title'] for todo in client.get('/api/todos', headers=GLOBEX).json] == ["Globex"]
+
+def test_bounded_by_bytes_with_lru_eviction(app, client, cache, monkeypatch):
+    client.post('/api/todos', json={"title": "Sized"})
+    entry_size = len(client.get('/api/todos?limit=1').data)
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_MAX_BYTES', entry_size * 2)
+    client.get('/api/todos?limit=2')
+    client.get('/api/todos?limit=1') # most recently used
+    client.get('/api/todos?limit=3') # evicts limit=2
+    stats = response_cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= entry_size * 2
+    assert client.get('/api/todos?limit=1').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/todos?limit=2').headers['X-Cache'] == 'MISS'
+
+def test_ttl_expiry(app, client, cache, monkeypatch):
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_TTL', 0.01)
+    client.get('/api/todos')
+    time.sleep(0.02)
+    assert client.get('/api/todos').headers['X-Cache'] == 'MISS'
@@ -1,6 +1,6 @@
 import pytest
 from marshmallow import ValidationError
-from app.schemas import TodoSchema
+from app.schemas import TodoSchema, todo_payload_validator
 from app.models import Todo
 from datetime import datetime
 
@@ -72,18 +72,18 @@ def test_validate_missing_title():
     assert "Missing data for required field." in excinfo.value.messages["title"]
 
 def test_validate_title_too_short():
-    invalid_data = {"title": "T", "description": "Short title"}
+    invalid_data = {"title": "", "description": "Short title"}
     with pytest.raises(ValidationError) as excinfo:
         todo_schema.load(invalid_data)
     assert "title" in excinfo.value.messages
-    assert "Title must be between 2 and 100 characters long." in excinfo.value.messages["title"][0]
+    assert "Length must be between 1 and 150." in excinfo.value.messages["title"][0]
 
 def test_validate_title_too_long():
-    invalid_data = {"title": "T" * 101, "description": "Long title"}
+    invalid_data = {"title": "T" * 151, "description": "Long title"} # the todos.title column is VARCHAR(150)
     with pytest.raises(ValidationError) as excinfo:
         todo_schema.load(invalid_data)
     assert "title" in excinfo.value.messages
-    assert "Title must be between 2 and 100 characters long." in excinfo.value.messages["title"][0]
+    assert "Length must be between 1 and 150." in excinfo.value.messages["title"][0]
 
 def test_validate_title_whitespace_only():
     invalid_data = {"title": "   ", "description": "Whitespace title"}
@@ -93,20 +93,17 @@ def test_validate_title_whitespace_only():
     assert "Title cannot be empty or just whitespace." in excinfo.value.messages["title"][0]
 
 def test_validate_description_too_long():
-    invalid_data = {"title": "Valid Title", "description": "D" * 201}
+    invalid_data = {"title": "Valid Title", "description": "D" * 501}
     with pytest.raises(ValidationError) as excinfo:
         todo_schema.load(invalid_data)
     assert "description" in excinfo.value.messages
-    assert "Description cannot exceed 200 characters." in excinfo.value.messages["description"][0]
+    assert "Longer than maximum length 500." in excinfo.value.messages["description"][0]
 
 def test_deserialize_unknown_field():
-    data_with_unknown = {"title": "Test Unknown", "extra_field": "should be ignored"}
-    try:
-        todo_obj = todo_schema.load(data_with_unknown)
-        assert todo_obj.title == "Test Unknown"
-        assert not hasattr(todo_obj, "extra_field")
-    except ValidationError:
-        pytest.fail("Deserialization failed with unknown field, check schema EXCLUDE behavior.")
+    data_with_unknown = {"title": "Test Unknown", "extra_field": "should be rejected"}
+    with pytest.raises(ValidationError) as excinfo: # the schema keeps marshmallow's default unknown=RAISE
+        todo_schema.load(data_with_unknown)
+    assert excinfo.value.messages == {"extra_field": ["Unknown field."]}
 
 def test_make_todo_method():
     data = {"title": "Make Me", "description": "A todo from make_todo"}
@@ -114,22 +111,49 @@ def test_make_todo_method():
     assert isinstance(todo_instance, Todo)
     assert todo_instance.title == data["title"]
     assert todo_instance.description == data["description"]
-    assert todo_instance.completed is False # Default
+    assert todo_instance.completed is None # the column default applies on insert, load() fills in False before make_todo
 
 # Test partial updates (deserialization)
 def test_deserialize_partial_data():
     partial_data = {"description": "Updated Description Only"}
     # When loading partial, it should not raise validation error for missing 'title'
     try:
-        update_data_dict = todo_schema.load(partial_data, partial=True)
-        assert "title" not in update_data_dict # title was not provided, so not in result
-        assert update_data_dict["description"] == "Updated Description Only"
+        update_obj = todo_schema.load(partial_data, partial=True) # post_load still builds a Todo, the routes use todo_payload_validator
+        assert update_obj.title is None # title was not provided, so not set
+        assert update_obj.description == "Updated Description Only"
     except ValidationError as e:
         pytest.fail(f"Partial deserialization failed: {e.messages}")
 
 def test_deserialize_partial_with_validation_error():
-    partial_invalid_data = {"title": "T"} # title too short
+    partial_invalid_data = {"title": ""} # title too short
     with pytest.raises(ValidationError) as excinfo:
         todo_schema.load(partial_invalid_data, partial=True)
     assert "title" in excinfo.value.messages
-    assert "Title must be between 2 and 100 characters long." in excinfo.value.messages["title"][0]
+    assert "Length must be between 1 and 150." in excinfo.value.messages["title"][0]
+
+# --- Validation fast path (todo_payload_validator) ---
+
+@pytest.mark.parametrize("payload, partial", [
+    ({"description": "A todo without a title"}, False),
+    ({"title": ""}, False),
+    ({"title": "   "}, True),
+    ({"title": "T" * 151}, True),
+    ({"title": None}, True),
+    ({"title": "Valid", "completed": "not a bool"}, False),
+    ({"title": "Valid", "extra_field": "unknown"}, False),
+    ({"id": 5}, True),
+    (["not", "a", "dict"], False),
+])
+def test_fast_path_errors_match_schema(payload, partial):
+    with pytest.raises(ValidationError) as schema_err:
+        todo_schema.load(payload, partial=partial)
+    with pytest.raises(ValidationError) as fast_err:
+        todo_payload_validator.validate(payload, partial=partial)
+    assert fast_err.value.messages == schema_err.value.messages
+
+def test_fast_path_returns_plain_dict():
+    data = todo_payload_validator.validate(valid_todo_data)
+    assert data == {"title": "Test Todo", "description": "A description for the test todo", "completed": False}
+
+def test_fast_path_partial_only_sent_fields():
+    assert todo_payload_validator.validate({"completed": "true"}, partial=True) == {"completed": True}
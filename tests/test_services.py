@@ -93,6 +93,17 @@ def test_update_todo_service_non_existent(init_database):
     assert Todo.query.get(999) is None # ensure it didn't magically create it
 
 
+def test_cached_statements_rebind_arguments(init_database):
+    db.session.add_all([Todo(title=f"Page {i}") for i in range(5)])
+    db.session.commit()
+    ids = [todo.id for todo in TodoService.get_all_todos()]
+
+    # The same cached lambda statements must pick up new values on every call
+    assert [todo.id for todo in TodoService.get_todos_page(0, 2)] == ids[:2]
+    assert [todo.id for todo in TodoService.get_todos_page(ids[1], 3)] == ids[2:5]
+    assert TodoService.get_todo_by_id(ids[0]).id == ids[0]
+    assert TodoService.get_todo_by_id(ids[4]).id == ids[4]
+
 # --- Test delete_todo --- #
 def test_delete_todo_service_existing(init_database):
     todo_to_delete = Todo(title="To Be Deleted")
@@ -102,7 +113,9 @@ def test_delete_todo_service_existing(init_database):
 
     TodoService.delete_todo(todo_to_delete)
     
-    assert Todo.query.get(todo_id) is None
+    assert TodoService.get_todo_by_id(todo_id) is None
+    assert Todo.query.get(todo_id).deleted_at is not None # soft deleted
+    assert TodoService.get_all_todos() == []
 
 def test_delete_todo_service_non_existent_instance(init_database):
     # Similar to update, the service expects a valid ORM instance that's in the session.
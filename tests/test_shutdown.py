@@ -0,0 +1,65 @@
+import os
+import signal
+import threading
+import time
+import pytest
+from app import create_app
+from app.shutdown import drain, install_signal_handlers
+from config import TestingConfig
+
+@pytest.fixture()
+def draining_app():
+    """A separate app, draining disposes its engine and stops its job queue."""
+    return create_app(TestingConfig)
+
+def test_drain_waits_for_in_flight_requests(draining_app):
+    release = threading.Event()
+
+    @draining_app.route('/slow')
+    def slow():
+        release.wait(5)
+        return 'done'
+
+    client = draining_app.test_client()
+    responses = []
+    request_thread = threading.Thread(target=lambda: responses.append(client.get('/slow')))
+    request_thread.start()
+    state = draining_app.extensions['shutdown']
+    while state['in_flight'] == 0:
+        time.sleep(0.01)
+
+    results = []
+    drain_thread = threading.Thread(target=lambda: results.append(drain(draining_app, timeout=5)))
+    drain_thread.start()
+    while not state['draining']:
+        time.sleep(0.01)
+
+    rejected = client.get('/api/todos')
+    assert rejected.status_code == 503
+    assert rejected.headers['Connection'] == 'close'
+    assert client.get('/readyz').status_code == 503
+    assert client.get('/healthz').status_code == 200 # still alive, only out of rotation
+    assert drain_thread.is_alive() # still waiting for /slow
+
+    release.set()
+    request_thread.join()
+    drain_thread.join()
+    assert responses[0].data == b'done'
+    assert results == [True]
+    assert state['in_flight'] == 0
+
+def test_drain_times_out(draining_app):
+    draining_app.extensions['shutdown']['in_flight'] = 1 # a request that never finishes
+    assert drain(draining_app, timeout=0.05) is False
+    assert draining_app.extensions['shutdown']['drained'].is_set() # cleanup still ran
+
+def test_signal_drains_then_calls_previous_handler(draining_app):
+    received = threading.Event()
+    original = signal.signal(signal.SIGUSR1, lambda signum, frame: received.set())
+    try:
+        install_signal_handlers(draining_app, signals=(signal.SIGUSR1,))
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert received.wait(5)
+        assert draining_app.extensions['shutdown']['drained'].is_set()
+    finally:
+        signal.signal(signal.SIGUSR1, original)
@@ -0,0 +1,61 @@
+import threading
+from sqlalchemy import text
+from app import create_app, db
+from app.models import Todo
+from app.sqlite_tuning import WRITER_LOCK_KEY
+from config import TestingConfig
+
+def test_pragmas_applied_on_connect(tmp_path):
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'todos.sqlite3'}"
+
+    file_app = create_app(FileConfig)
+    with file_app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert connection.execute(text('PRAGMA synchronous')).scalar() == 1 # NORMAL
+            assert connection.execute(text('PRAGMA busy_timeout')).scalar() == FileConfig.SQLITE_BUSY_TIMEOUT_MS
+        db.engine.dispose()
+
+def test_writer_lock_held_until_commit(app, init_database):
+    db.session.add(Todo(title="Locked"))
+    db.session.flush()
+    assert WRITER_LOCK_KEY in db.session.info
+
+    acquired = []
+    other = threading.Thread(target=lambda: acquired.append(app.extensions['sqlite_writer']['lock'].acquire(timeout=0.05)))
+    other.start()
+    other.join()
+    assert acquired == [False] # another thread cannot write while this transaction is open
+
+    db.session.commit()
+    assert WRITER_LOCK_KEY not in db.session.info
+    assert app.extensions['sqlite_writer']['lock'].acquire(timeout=0.05)
+    app.extensions['sqlite_writer']['lock'].release()
+
+def test_writer_lock_released_on_rollback(app, init_database):
+    db.session.add(Todo(title="Discarded"))
+    db.session.flush()
+    db.session.rollback()
+    assert WRITER_LOCK_KEY not in db.session.info
+
+def test_writer_lock_timeout_returns_503(app, client, init_database):
+    lock = app.extensions['sqlite_writer']['lock']
+    holder_ready, release = threading.Event(), threading.Event()
+
+    def hold():
+        with lock:
+            holder_ready.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    holder_ready.wait()
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = 50
+    try:
+        response = client.post('/api/todos', json={"title": "Blocked"})
+    finally:
+        app.config['SQLITE_BUSY_TIMEOUT_MS'] = TestingConfig.SQLITE_BUSY_TIMEOUT_MS
+        release.set()
+        holder.join()
+    assert response.status_code == 503
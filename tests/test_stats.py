@@ -0,0 +1,57 @@
+import io
+from app.models import Todo, TodoStat
+from app.services.todo_stats_service import todo_stats
+from app.services.todo_transfer_service import TodoTransferService
+from app import db
+
+def test_stats_empty(client, init_database):
+    response = client.get('/api/todos/stats')
+    assert response.status_code == 200
+    assert response.json == {"total": 0, "completed": 0, "open": 0}
+
+def test_stats_incremental_counts(client, init_database):
+    created = client.post('/api/todos', json={"title": "Counted"}).json
+    client.post('/api/todos', json={"title": "Also counted", "completed": True})
+    client.put(f'/api/todos/{created["id"]}', json={"completed": True})
+    assert client.get('/api/todos/stats').json == {"total": 2, "completed": 2, "open": 0}
+
+    client.delete(f'/api/todos/{created["id"]}')
+    assert client.get('/api/todos/stats').json == {"total": 1, "completed": 1, "open": 0}
+    assert [(row.total, row.completed) for row in TodoStat.query.all()] == [(1, 1)] # one row for today, adjusted in place
+
+def test_stats_count_imports(client, init_database):
+    TodoTransferService.import_todos(io.BytesIO(b"title,completed\nFirst,true\nSecond,false\nThird,false\n"), batch_size=2)
+    assert client.get('/api/todos/stats').json == {"total": 3, "completed": 1, "open": 2}
+
+def test_stats_reconcile_picks_up_direct_writes(client, init_database):
+    client.post('/api/todos', json={"title": "Through the API"})
+    db.session.add_all([Todo(title="Direct 1"), Todo(title="Direct 2", completed=True)])
+    db.session.commit()
+    assert client.get('/api/todos/stats').json["total"] == 1 # not written through TodoService
+
+    todo_stats.reconcile()
+    assert client.get('/api/todos/stats').json == {"total": 3, "completed": 1, "open": 2}
+
+    client.post('/api/todos', json={"title": "After the recount", "completed": True}) # increments apply on top of the recount
+    assert client.get('/api/todos/stats').json == {"total": 4, "completed": 2, "open": 2}
+
+def test_reconcile_stats_cli_command(runner, init_database):
+    db.session.add(Todo(title="Direct", tenant_id="acme"))
+    db.session.commit()
+    result = runner.invoke(args=['todos', 'reconcile-stats'])
+    assert "Reconciled the statistics of 1 tenants." in result.output
+    assert [(row.tenant_id, row.total) for row in TodoStat.query.all()] == [("acme", 1)]
+
+def test_stats_bucketed_by_day(client, init_database):
+    todo = client.post('/api/todos', json={"title": "Bucketed"}).json
+    response = client.get('/api/todos/stats?bucket=day')
+    assert response.status_code == 200
+    buckets = response.json["by_day"]
+    assert len(buckets) == 1
+    assert buckets[0]["date"] == todo["created_at"][:10]
+    assert buckets[0]["total"] == 1
+    assert buckets[0]["open"] == 1
+
+def test_stats_invalid_bucket(client, init_database):
+    response = client.get('/api/todos/stats?bucket=week')
+    assert response.status_code == 400
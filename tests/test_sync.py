@@ -0,0 +1,68 @@
+from sqlalchemy.dialects import postgresql
+from app.models import TodoChange
+from app.services.todo_sync_service import TodoSyncService
+
+def _sync(client, token=None, **params):
+    if token:
+        params['since'] = token
+    response = client.get('/api/todos/changes', query_string=params)
+    assert response.status_code == 200
+    return response.json
+
+def test_initial_sync_returns_all_todos(client, init_database):
+    client.post('/api/todos', json={"title": "First"})
+    client.post('/api/todos', json={"title": "Second"})
+    data = _sync(client)
+    assert [change["todo"]["title"] for change in data["changes"]] == ["First", "Second"]
+    assert data["has_more"] is False
+
+def test_sync_returns_only_new_changes(client, init_database):
+    first = client.post('/api/todos', json={"title": "First"}).json
+    second = client.post('/api/todos', json={"title": "Second"}).json
+    token = _sync(client)["next"]
+
+    client.put(f'/api/todos/{first["id"]}', json={"completed": True})
+    client.put(f'/api/todos/{first["id"]}', json={"title": "First renamed"})
+    client.delete(f'/api/todos/{second["id"]}')
+
+    data = _sync(client, token)
+    assert data["changes"] == [
+        {"id": first["id"], "op": "upsert", "todo": data["changes"][0]["todo"]},
+        {"id": second["id"], "op": "delete"},
+    ]
+    assert data["changes"][0]["todo"]["title"] == "First renamed" # coalesced to the latest state
+    assert _sync(client, data["next"])["changes"] == []
+
+def test_sync_pagination(client, init_database):
+    for index in range(3):
+        client.post('/api/todos', json={"title": f"Todo {index}"})
+    page = _sync(client, limit=2)
+    assert len(page["changes"]) == 2 and page["has_more"] is True
+    page = _sync(client, page["next"], limit=2)
+    assert len(page["changes"]) == 1 and page["has_more"] is False
+
+def test_invalid_token(client, init_database):
+    assert client.get('/api/todos/changes?since=not-a-token').status_code == 400
+
+def test_token_before_compacted_tombstone_expires(client, runner, init_database):
+    todo = client.post('/api/todos', json={"title": "Removed offline"}).json
+    token = _sync(client)["next"]
+    client.delete(f'/api/todos/{todo["id"]}')
+    assert 'Removed 2 change-log rows' in runner.invoke(args=['todos', 'compact-changes', '--days', '0']).output
+
+    assert client.get('/api/todos/changes', query_string={'since': token}).status_code == 410 # the client would miss the delete
+    assert _sync(client)["changes"] == [] # a full resync still works
+
+def test_compaction_keeps_latest_change_per_todo(client, init_database):
+    todo = client.post('/api/todos', json={"title": "Busy"}).json
+    for _ in range(3):
+        client.put(f'/api/todos/{todo["id"]}', json={"completed": True})
+    assert TodoChange.query.count() == 4
+
+    TodoSyncService.compact_changes(30)
+    assert TodoChange.query.count() == 1
+    assert _sync(client)["changes"][0]["todo"]["completed"] is True
+
+def test_xid_recorded_per_transaction_on_postgresql():
+    insert = TodoChange.__table__.insert().values(todo_id=1, op='upsert')
+    assert 'txid_current()' in str(insert.compile(dialect=postgresql.dialect()))
@@ -0,0 +1,57 @@
+import pytest
+
+ACME = {'X-API-Key': 'acme-key'}
+GLOBEX = {'X-API-Key': 'globex-key'}
+
+@pytest.fixture()
+def tenants(app, init_database, monkeypatch):
+    monkeypatch.setitem(app.config, 'TENANT_API_KEYS', {'acme-key': 'acme', 'globex-key': 'globex'})
+
+def test_todos_are_isolated_per_tenant(client, tenants):
+    todo_id = client.post('/api/todos', json={"title": "Acme todo"}, headers=ACME).json['id']
+
+    assert [todo['id'] for todo in client.get('/api/todos', headers=ACME).json] == [todo_id]
+    assert client.get('/api/todos', headers=GLOBEX).json == []
+    assert client.get('/api/todos?limit=10', headers=GLOBEX).json == []
+    assert client.get('/api/todos', headers={}).json == [] # no key is the default tenant
+    assert client.get(f'/api/todos/{todo_id}', headers=GLOBEX).status_code == 404
+    assert client.put(f'/api/todos/{todo_id}', json={"completed": True}, headers=GLOBEX).status_code == 404
+    assert client.delete(f'/api/todos/{todo_id}', headers=GLOBEX).status_code == 404
+    assert client.get(f'/api/todos/{todo_id}', headers=ACME).status_code == 200
+
+def test_unknown_api_key_rejected(client, tenants):
+    assert client.get('/api/todos', headers={'X-API-Key': 'wrong'}).status_code == 401
+
+def test_api_key_required(app, client, tenants, monkeypatch):
+    monkeypatch.setitem(app.config, 'TENANT_REQUIRE_API_KEY', True)
+    assert client.get('/api/todos').status_code == 401
+    assert client.get('/api/todos', headers=ACME).status_code == 200
+    assert client.get('/healthz').status_code == 200 # probes are not tenant scoped
+
+def test_quota_per_tenant(app, client, tenants, monkeypatch):
+    monkeypatch.setitem(app.config, 'TENANT_MAX_TODOS', 2)
+    for i in range(2):
+        assert client.post('/api/todos', json={"title": f"Acme {i}"}, headers=ACME).status_code == 201
+    response = client.post('/api/todos', json={"title": "One too many"}, headers=ACME)
+    assert response.status_code == 403
+    assert "quota" in response.json['description']
+    assert client.post('/api/todos', json={"title": "Globex"}, headers=GLOBEX).status_code == 201
+
+    client.delete(f"/api/todos/{client.get('/api/todos', headers=ACME).json[0]['id']}", headers=ACME)
+    assert client.post('/api/todos', json={"title": "Freed"}, headers=ACME).status_code == 201 # soft deleted todos do not count
+
+def test_stats_per_tenant(client, tenants):
+    client.post('/api/todos', json={"title": "Acme 1"}, headers=ACME)
+    client.post('/api/todos', json={"title": "Acme 2", "completed": True}, headers=ACME)
+    client.post('/api/todos', json={"title": "Globex 1"}, headers=GLOBEX)
+
+    assert client.get('/api/todos/stats', headers=ACME).json == {'total': 2, 'completed': 1, 'open': 1}
+    assert client.get('/api/todos/stats', headers=GLOBEX).json == {'total': 1, 'completed': 0, 'open': 1}
+
+def test_sync_per_tenant(client, tenants):
+    acme_id = client.post('/api/todos', json={"title": "Acme"}, headers=ACME).json['id']
+    globex_id = client.post('/api/todos', json={"title": "Globex"}, headers=GLOBEX).json['id']
+    client.delete(f'/api/todos/{globex_id}', headers=GLOBEX)
+
+    assert [change['id'] for change in client.get('/api/todos/changes', headers=ACME).json['changes']] == [acme_id]
+    assert client.get('/api/todos/changes', headers=GLOBEX).json['changes'] == [{'id': globex_id, 'op': 'delete'}]
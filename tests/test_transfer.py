@@ -0,0 +1,106 @@
+import csv
+import io
+import pytest
+from app import db, deadlines
+from app.deadlines import remaining_seconds
+from app.models import Todo, TodoChange
+from app.services.todo_transfer_service import EXPORT_COLUMNS, TodoTransferService, TransferFormatError
+from app.tenancy import tenant_scope
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+@pytest.fixture()
+def admin(app, init_database, monkeypatch):
+    monkeypatch.setitem(app.config, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setitem(app.config, 'TENANT_API_KEYS', {'acme-key': 'acme'})
+
+def _csv(*rows):
+    return ("title,description,completed\n" + "".join(f"{row}\n" for row in rows)).encode()
+
+def test_import_validates_in_batches(init_database):
+    source = io.BytesIO(_csv("First,,true", "Second,Details,false", ",missing title,false", "Third,,maybe"))
+    report = TodoTransferService.import_todos(source, batch_size=2)
+
+    assert report['imported'] == 2
+    assert report['rejected'] == 2
+    assert set(report['errors']) == {3, 4} # 1-based row numbers across batches
+    assert 'completed' in report['errors'][4]
+    todos = Todo.query.order_by(Todo.id).all()
+    assert [(todo.title, todo.description, todo.completed) for todo in todos] == [("First", None, True), ("Second", "Details", False)]
+    assert TodoChange.query.filter_by(op='upsert').count() == 2 # visible to delta-sync clients
+
+def test_export_import_round_trip(init_database):
+    db.session.add_all([Todo(title="Keep", description="a, \"quoted\"\nline", completed=True), Todo(title="Gone")])
+    db.session.commit()
+    Todo.query.filter_by(title="Gone").first().deleted_at = db.func.now()
+    db.session.commit()
+
+    output = io.BytesIO()
+    assert TodoTransferService.export_todos(output) == 1
+    rows = list(csv.DictReader(io.StringIO(output.getvalue().decode())))
+    assert [(row['title'], row['description'], row['completed']) for row in rows] == [("Keep", "a, \"quoted\"\nline", "true")]
+
+    with tenant_scope('other'):
+        report = TodoTransferService.import_todos(io.BytesIO(output.getvalue()))
+    assert report == {'imported': 1, 'rejected': 0, 'errors': {}}
+    assert Todo.query.filter_by(tenant_id='other').one().description == "a, \"quoted\"\nline"
+
+def test_unsupported_format(init_database):
+    with pytest.raises(TransferFormatError):
+        TodoTransferService.export_todos(io.BytesIO(), fmt='xlsx')
+
+def test_parquet_round_trip(init_database):
+    pytest.importorskip('pyarrow')
+    db.session.add(Todo(title="Columnar", completed=True))
+    db.session.commit()
+    output = io.BytesIO()
+    assert TodoTransferService.export_todos(output, fmt='parquet') == 1
+    output.seek(0)
+    with tenant_scope('other'):
+        assert TodoTransferService.import_todos(output, fmt='parquet')['imported'] == 1
+
+def test_admin_endpoints_require_token(app, client, init_database, monkeypatch):
+    assert client.get('/api/admin/todos/export').status_code == 404 # disabled without ADMIN_TOKEN
+    monkeypatch.setitem(app.config, 'ADMIN_TOKEN', 'secret')
+    assert client.get('/api/admin/todos/export', headers={'X-Admin-Token': 'wrong'}).status_code == 401
+
+def test_admin_import_and_export(client, admin):
+    headers = {**ADMIN, 'X-API-Key': 'acme-key'}
+    response = client.post('/api/admin/todos/import', data=_csv("Imported,,false", ",,false"), headers=headers)
+    assert response.status_code == 200
+    assert response.json == {'imported': 1, 'rejected': 1, 'errors': {'2': {'title': ['Missing data for required field.']}}}
+
+    response = client.get('/api/admin/todos/export', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.is_streamed
+    assert [row['title'] for row in csv.DictReader(io.StringIO(response.get_data(as_text=True)))] == ["Imported"]
+    response = client.get('/api/admin/todos/export', headers=ADMIN)
+    assert response.get_data(as_text=True).splitlines() == [",".join(EXPORT_COLUMNS)] # default tenant has nothing
+
+def test_admin_transfers_skip_request_deadline(client, admin, monkeypatch):
+    budgets = []
+    def recording_remaining_seconds():
+        budgets.append(remaining_seconds())
+        return budgets[-1]
+    monkeypatch.setattr(deadlines, 'remaining_seconds', recording_remaining_seconds) # consulted by _apply_statement_timeout
+
+    client.post('/api/admin/todos/import', data=_csv("Long import,,false"), headers=ADMIN)
+    client.get('/api/admin/todos/export', headers=ADMIN).get_data()
+    assert budgets and all(budget is None for budget in budgets) # no SET LOCAL statement_timeout
+
+    db.session.commit() # the test session is shared, let the next request begin its own transaction
+    client.get('/api/todos')
+    assert budgets[-1] is not None # other API requests keep their budget
+
+def test_cli_import_export(runner, init_database, tmp_path):
+    source = tmp_path / 'todos.csv'
+    source.write_bytes(_csv("From CLI,,true"))
+    result = runner.invoke(args=['todos', 'import', str(source), '--tenant', 'acme'])
+    assert result.exit_code == 0
+    assert "Imported 1 todos, rejected 0 rows." in result.output
+
+    target = tmp_path / 'export.csv'
+    result = runner.invoke(args=['todos', 'export', str(target), '--tenant', 'acme'])
+    assert result.exit_code == 0
+    assert "From CLI" in target.read_text()
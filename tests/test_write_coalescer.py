@@ -0,0 +1,104 @@
+import threading
+import time
+import pytest
+from flask import g
+from app.deadlines import DeadlineExceeded
+from app.services.write_coalescer import CoalescedWriteError, _KeyWrites, _PendingWrite, write_coalescer
+
+@pytest.fixture()
+def window(app):
+    app.config['WRITE_COALESCE_WINDOW_MS'] = 200
+    yield
+    app.config['WRITE_COALESCE_WINDOW_MS'] = 0
+
+def _concurrent(app, first, later, apply):
+    """Submits first, then the later updates while first is being written, and returns every result in submission order."""
+    results = {}
+
+    def request(index, fields):
+        with app.app_context():
+            try:
+                results[index] = write_coalescer.submit(7, fields, apply)
+            except Exception as err:
+                results[index] = err
+
+    first_thread = threading.Thread(target=request, args=(0, first))
+    first_thread.start()
+    threads = [first_thread]
+    while 7 not in app.extensions['write_coalescer']['writes']:
+        pass # wait until the first write is in progress
+    for index, fields in enumerate(later, 1):
+        threads.append(threading.Thread(target=request, args=(index, fields)))
+        threads[-1].start()
+        writes = app.extensions['write_coalescer']['writes'][7]
+        while writes.next is None or writes.next.joined < index - 1:
+            pass # wait until the update joined the pending write
+    for thread in threads:
+        thread.join()
+    return [results[index] for index in range(len(threads))]
+
+def test_disabled_window_applies_directly(app):
+    with app.app_context():
+        assert write_coalescer.submit(1, {"title": "Direct"}, lambda fields: fields) == {"title": "Direct"}
+
+def test_uncontended_update_does_not_wait(app, window):
+    with app.app_context():
+        started = time.monotonic()
+        assert write_coalescer.submit(1, {"title": "Direct"}, lambda fields: fields) == {"title": "Direct"}
+        assert time.monotonic() - started < 0.1 # no window without a second writer
+        assert app.extensions['write_coalescer']['writes'] == {}
+
+def test_updates_during_a_write_merged_into_one_write(app, window):
+    applied = []
+    release = threading.Event()
+
+    def apply(fields):
+        applied.append(fields)
+        if len(applied) == 1:
+            release.wait(5) # keep the first write in progress while the others arrive
+        return dict(fields)
+
+    threading.Timer(0.1, release.set).start()
+    results = _concurrent(app, {"title": "First"}, [{"completed": True, "title": "Second"}, {"completed": False}, {"completed": True}], apply)
+
+    assert applied == [{"title": "First"}, {"completed": True, "title": "Second"}]
+    assert results[0] == {"title": "First"}
+    assert all(result == applied[1] for result in results[1:]) # every merged request sees the final state
+    assert app.extensions['write_coalescer']['writes'] == {}
+
+def test_followers_get_their_own_chained_error(app, window):
+    failure = RuntimeError("update failed")
+    release = threading.Event()
+    calls = []
+
+    def apply(fields):
+        calls.append(fields)
+        if len(calls) == 1:
+            release.wait(5)
+            return dict(fields)
+        raise failure
+
+    threading.Timer(0.1, release.set).start()
+    results = _concurrent(app, {"title": "First"}, [{"completed": True}, {"completed": False}, {"title": "Third"}], apply)
+
+    assert results[1] is failure # the leader of the merged write sees the original error
+    followers = results[2:]
+    assert all(isinstance(error, CoalescedWriteError) and error.__cause__ is failure for error in followers)
+    assert followers[0] is not followers[1]
+
+def test_update_route_through_coalescer(client, new_todo, window):
+    response = client.put(f'/api/todos/{new_todo.id}', json={"completed": True})
+    assert response.status_code == 200
+    assert response.json["completed"] is True
+
+def test_follower_gives_up_at_its_deadline(app, window):
+    state = app.extensions['write_coalescer']
+    writes = state['writes'][9] = _KeyWrites()
+    writes.next = _PendingWrite({"title": "Stalled leader"}) # a leader that never finishes
+    try:
+        with app.test_request_context():
+            g.deadline = time.monotonic() + 0.05
+            with pytest.raises(DeadlineExceeded):
+                write_coalescer.submit(9, {"completed": True}, lambda fields: fields)
+    finally:
+        del state['writes'][9]